@@ -0,0 +1,373 @@
+"""
+Headless benchmarks for TLITE's editor hot paths.
+
+	python benchmark.py [--quick] [--output results.json]
+
+Runs under QT_QPA_PLATFORM=offscreen with a throwaway config directory and
+synthetic documents from 1 KB to 100 MB. Results are written as JSON and
+compared against benchmark_baseline.json: any timing slower than the baseline
+by more than --tolerance fails the run with exit status 1. Timings are only
+comparable on the machine the baseline was recorded on, so refresh it with
+--update-baseline after an intentional change or on a new machine. A run is
+only compared when it uses the same --repeats as the baseline, because a
+single run includes one-off costs such as starting worker processes that
+best-of-N hides; a run that cannot be compared exits with status 2 unless
+--allow-mismatch is given.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+BENCH_HOME = tempfile.mkdtemp(prefix="tlite-bench-")
+os.environ["HOME"] = BENCH_HOME
+os.environ["USERPROFILE"] = BENCH_HOME
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+os.chdir(REPO_DIR)
+sys.path.insert(0, REPO_DIR)
+
+import main
+from PyQt5.QtWidgets import QApplication, QMessageBox
+from PyQt5.QtGui import QKeyEvent, QTextCursor
+from PyQt5.QtCore import Qt, QEvent, QT_VERSION_STR
+
+BASELINE_PATH = os.path.join(REPO_DIR, "benchmark_baseline.json")
+SIZES = {
+	"1KB": 1 << 10,
+	"100KB": 100 << 10,
+	"1MB": 1 << 20,
+	"10MB": 10 << 20,
+	"100MB": 100 << 20,
+}
+QUICK_SIZES = ("1KB", "100KB", "1MB")
+TYPED_TEXT = "the quick brown fox (jumps) over the lazy dog. "
+FILLER_WORDS = ["editor", "window", "line", "block", "lorem", "ipsum", "quietly", "measured", "river", "stone"]
+
+
+def make_document(size, words):
+	"""
+	Deterministic English-like text of roughly `size` characters: sentences of
+	linted and filler words, occasional brackets, blank lines between paragraphs.
+	"""
+	rng = random.Random(size)
+	vocabulary = list(words) + FILLER_WORDS
+	lines = []
+	total = 0
+	chunk_limit = min(size, 1 << 20)
+	while total < chunk_limit:
+		sentence = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(6, 12)))
+		if rng.random() < 0.2:
+			sentence = f"({sentence})"
+		line = sentence.capitalize() + "."
+		if rng.random() < 0.15:
+			line += "\n"
+		lines.append(line)
+		total += len(line) + 1
+	chunk = "\n".join(lines)
+	text = (chunk + "\n") * (size // (len(chunk) + 1) + 1)
+	# Cut on a line boundary so every bracketed sentence stays balanced.
+	return text[:text.rfind("\n", 0, size) + 1]
+
+
+def settle(app):
+	app.processEvents()
+	QApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+
+
+def open_text_tab(window, text, app):
+	"""
+	New tab holding `text`, returned once the lint workers have sent back every
+	block so later timings are not mixed with applying their results.
+	"""
+	window.new_document()
+	tab = window.current_tab()
+	tab.editor.setPlainText(text)
+	while tab.linter.busy:
+		app.processEvents()
+		time.sleep(0.001)
+	return tab
+
+
+def close_current_tab(window, app):
+	window.close_tab(window.tabs.currentIndex())
+	settle(app)
+
+
+def timed(fn):
+	start = time.perf_counter()
+	fn()
+	return time.perf_counter() - start
+
+
+def bench_highlight(ctx, text):
+	tab = open_text_tab(ctx.window, text, ctx.app)
+	linter = tab.linter
+	with linter.synchronous():
+		seconds = timed(linter.rehighlight)
+	# The same pass with the lint workers: time the GUI thread is blocked, and
+	# time until every block has its formats.
+	start = time.perf_counter()
+	linter.rehighlight()
+	blocking = time.perf_counter() - start
+	while linter.busy:
+		ctx.app.processEvents()
+		time.sleep(0.001)
+	offloaded = time.perf_counter() - start
+	close_current_tab(ctx.window, ctx.app)
+	return {
+		"seconds": seconds,
+		"mb_per_s": len(text) / (1 << 20) / seconds,
+		"blocking_seconds": blocking,
+		"offloaded_seconds": offloaded,
+	}
+
+
+def bench_typing(ctx, text):
+	tab = open_text_tab(ctx.window, text, ctx.app)
+	editor = tab.editor
+	cursor = editor.textCursor()
+	cursor.setPosition(len(text) // 2)
+	cursor.movePosition(QTextCursor.EndOfBlock)
+	editor.setTextCursor(cursor)
+	latencies = []
+	for ch in TYPED_TEXT * 4:
+		event = QKeyEvent(QEvent.KeyPress, Qt.Key_Space if ch == " " else ord(ch.upper()), Qt.NoModifier, ch)
+		start = time.perf_counter()
+		editor.keyPressEvent(event)
+		ctx.app.processEvents()
+		latencies.append((time.perf_counter() - start) * 1000)
+	close_current_tab(ctx.window, ctx.app)
+	latencies.sort()
+	return {
+		"p50_ms": statistics.median(latencies),
+		"p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+	}
+
+
+def bench_open(ctx, text):
+	path = ctx.write_file(text)
+	start = time.perf_counter()
+	tab = ctx.window.open_path(path)
+	ctx.app.processEvents()
+	seconds = time.perf_counter() - start
+	result = {"seconds": seconds}
+	if isinstance(tab, main.LargeFileTab):
+		while tab.indexer.isRunning():
+			ctx.app.processEvents()
+			time.sleep(0.001)
+		result["index_seconds"] = time.perf_counter() - start
+	else:
+		while tab.highlighter.active:
+			ctx.app.processEvents()
+		result["highlighted_seconds"] = time.perf_counter() - start
+	close_current_tab(ctx.window, ctx.app)
+	return result
+
+
+def bench_save(ctx, text):
+	open_text_tab(ctx.window, text, ctx.app)
+	path = os.path.join(ctx.workdir, "saved.txt")
+	start = time.perf_counter()
+	ctx.window._save_to_path(path)
+	blocking = time.perf_counter() - start
+	ctx.window.wait_for_saves()
+	seconds = time.perf_counter() - start
+	close_current_tab(ctx.window, ctx.app)
+	return {"seconds": seconds, "blocking_seconds": blocking}
+
+
+def bench_replace_all(ctx, text):
+	open_text_tab(ctx.window, text, ctx.app)
+	dock = ctx.window._ensure_find_dock()
+	dock.find_input.setText("the")
+	dock.replace_input.setText("teh")
+	seconds = timed(lambda: ctx.window.replace_all_text(dock))
+	close_current_tab(ctx.window, ctx.app)
+	return {"seconds": seconds}
+
+
+def bench_indent(ctx, text):
+	tab = open_text_tab(ctx.window, text, ctx.app)
+	tab.editor.selectAll()
+	indent = timed(ctx.window.indent_selection)
+	tab.editor.selectAll()
+	dedent = timed(ctx.window.dedent_selection)
+	close_current_tab(ctx.window, ctx.app)
+	return {"indent_seconds": indent, "dedent_seconds": dedent}
+
+
+def bench_bracket_match(ctx, text):
+	tab = open_text_tab(ctx.window, "(" + text + ")", ctx.app)
+	editor = tab.editor
+	cursor = editor.textCursor()
+	cursor.setPosition(1)
+	editor.setTextCursor(cursor)
+	editor.match_info = None
+	cold = timed(editor._update_bracket_matches)
+	warm = timed(editor._update_bracket_matches)
+	matched = editor.match_info and editor.match_info["matched"]
+	close_current_tab(ctx.window, ctx.app)
+	if not matched:
+		raise RuntimeError("outer bracket pair was not matched")
+	return {"cold_seconds": cold, "warm_seconds": warm}
+
+
+# name -> (function, largest size it runs at). Text tabs above 10 MB would be
+# opened as read-only large files, so only the open benchmark goes to 100 MB.
+BENCHMARKS = {
+	"highlight": (bench_highlight, "10MB"),
+	"typing": (bench_typing, "10MB"),
+	"open": (bench_open, "100MB"),
+	"save": (bench_save, "10MB"),
+	"replace_all": (bench_replace_all, "10MB"),
+	"indent": (bench_indent, "10MB"),
+	"bracket_match": (bench_bracket_match, "10MB"),
+}
+
+
+class BenchContext:
+	def __init__(self, app, window, workdir):
+		self.app = app
+		self.window = window
+		self.workdir = workdir
+
+	def write_file(self, text):
+		path = os.path.join(self.workdir, f"document_{len(text)}.txt")
+		if not os.path.exists(path):
+			with open(path, "w", encoding="utf-8", newline="\n") as f:
+				f.write(text)
+		return path
+
+
+def run_benchmarks(sizes, selected, repeats):
+	main.setup_user_config()
+	app = QApplication.instance() or QApplication(sys.argv[:1])
+	QMessageBox.information = staticmethod(lambda *args, **kwargs: QMessageBox.Ok)
+	window = main.MainWindow()
+	window.resize(1200, 800)
+	window.show()
+	settle(app)
+	words = main.LINT_RULES.get(main.get_user_config_path("linting.json")).words
+	ctx = BenchContext(app, window, tempfile.mkdtemp(prefix="docs-", dir=BENCH_HOME))
+
+	results = {}
+	for label in sizes:
+		text = make_document(SIZES[label], words)
+		for name in selected:
+			fn, max_label = BENCHMARKS[name]
+			if SIZES[label] > SIZES[max_label]:
+				continue
+			runs = repeats if SIZES[label] <= SIZES["1MB"] else 1
+			best = None
+			for _ in range(runs):
+				metrics = fn(ctx, text)
+				if best is None:
+					best = metrics
+				else:
+					best = {key: min(best[key], value) if not key.endswith("_per_s") else max(best[key], value) for key, value in metrics.items()}
+			key = f"{name}/{label}"
+			results[key] = best
+			print(f"{key:24s} " + "  ".join(f"{metric}={value:.4f}" for metric, value in best.items()), flush=True)
+	window.close()
+	return results
+
+
+def compared_metric(metric):
+	return metric.endswith("seconds") or metric.endswith("_ms")
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+	"""
+	Returns a list of human-readable regressions: timings slower than the
+	baseline by more than `tolerance` (a fraction) and by at least min_delta_ms.
+	"""
+	regressions = []
+	for key, metrics in results.items():
+		for metric, value in metrics.items():
+			base = baseline.get(key, {}).get(metric)
+			if base is None or not compared_metric(metric):
+				continue
+			value_ms = value if metric.endswith("_ms") else value * 1000
+			base_ms = base if metric.endswith("_ms") else base * 1000
+			if value_ms > base_ms * (1 + tolerance) and value_ms - base_ms >= min_delta_ms:
+				regressions.append(f"{key} {metric}: {value_ms:.1f} ms vs baseline {base_ms:.1f} ms (+{(value_ms / base_ms - 1) * 100:.0f}%)")
+	return regressions
+
+
+def main_cli():
+	parser = argparse.ArgumentParser(description="Headless benchmarks for TLITE's editor hot paths.")
+	parser.add_argument("--quick", action="store_true", help="only run the 1KB, 100KB and 1MB documents")
+	parser.add_argument("--sizes", nargs="+", choices=list(SIZES), help="document sizes to run")
+	parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="benchmarks to run")
+	parser.add_argument("--repeats", type=int, default=3, help="runs per benchmark up to 1MB; the best is kept")
+	parser.add_argument("--output", default="benchmark_results.json", help="where to write the results JSON")
+	parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON to compare against")
+	parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown as a fraction of the baseline")
+	parser.add_argument("--min-delta-ms", type=float, default=5.0, help="ignore slowdowns smaller than this")
+	parser.add_argument("--update-baseline", action="store_true", help="merge these results into the baseline")
+	parser.add_argument("--allow-mismatch", action="store_true", help="exit 0 instead of 2 when the baseline used different --repeats")
+	args = parser.parse_args()
+
+	sizes = args.sizes or (QUICK_SIZES if args.quick else list(SIZES))
+	selected = args.only or list(BENCHMARKS)
+	try:
+		results = run_benchmarks(sizes, selected, max(1, args.repeats))
+	finally:
+		shutil.rmtree(BENCH_HOME, ignore_errors=True)
+
+	report = {
+		"meta": {
+			"python": platform.python_version(),
+			"qt": QT_VERSION_STR,
+			"platform": platform.platform(),
+			"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+			"repeats": max(1, args.repeats),
+		},
+		"results": results,
+	}
+	with open(args.output, "w", encoding="utf-8") as f:
+		json.dump(report, f, indent=4)
+	print(f"Results written to {args.output}")
+
+	baseline = {}
+	if os.path.exists(args.baseline):
+		with open(args.baseline, "r", encoding="utf-8") as f:
+			baseline = json.load(f)
+
+	if args.update_baseline:
+		merged = {}
+		if baseline.get("meta", {}).get("repeats", report["meta"]["repeats"]) == report["meta"]["repeats"]:
+			merged.update(baseline.get("results", {}))
+		merged.update(results)
+		baseline = {"meta": report["meta"], "results": merged}
+		with open(args.baseline, "w", encoding="utf-8") as f:
+			json.dump(baseline, f, indent=4)
+		print(f"Baseline updated: {args.baseline}")
+		return 0
+
+	if not baseline:
+		print("No baseline found; run with --update-baseline to record one.")
+		return 0
+	baseline_repeats = baseline.get("meta", {}).get("repeats")
+	if baseline_repeats is not None and baseline_repeats != report["meta"]["repeats"]:
+		print(f"Not compared: the baseline was recorded with --repeats {baseline_repeats}, this run used --repeats {report['meta']['repeats']}.")
+		return 0 if args.allow_mismatch else 2
+	regressions = compare(results, baseline.get("results", {}), args.tolerance, args.min_delta_ms)
+	if regressions:
+		print("\nPERFORMANCE REGRESSIONS:")
+		for line in regressions:
+			print("  " + line)
+		return 1
+	print("No regressions against the baseline.")
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main_cli())
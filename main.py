@@ -1,18 +1,45 @@
 import re
+import bisect
+import math
+import itertools
+import heapq
+import hashlib
+import mmap
+from array import array
 import shutil
-import subprocess
-from pypresence import Presence
+import stat
+import tempfile
+import codecs
+import locale
 import atexit
+import threading
+import time
+import functools
+import contextlib
+from collections import Counter, deque
+import uuid
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait as wait_futures
+import fnmatch
+import signal
+try:
+	import pty
+	import termios
+except ImportError:
+	pty = None
+	termios = None
 
 from PyQt5.QtWidgets import (
 	QApplication, QMainWindow, QTextEdit, QFileDialog, QAction, QInputDialog, QFontDialog, QStatusBar,
 	QHBoxLayout, QPushButton, QCheckBox, QLabel, QLineEdit, QVBoxLayout, QWidget, QDockWidget, QDialog, QMessageBox,
-	QCompleter, QTreeView, QFileSystemModel, QPlainTextEdit, QTabWidget, QTabBar, QHeaderView, QMenu,
-	QComboBox, QScrollArea, QFormLayout
+	QCompleter, QTreeView, QPlainTextEdit, QTabWidget, QTabBar, QHeaderView, QMenu,
+	QComboBox, QScrollArea, QFormLayout, QProgressDialog, QAbstractScrollArea, QFileIconProvider, QTreeWidget,
+	QTreeWidgetItem, QListWidget, QPlainTextDocumentLayout
 )
-from PyQt5.QtGui import QSyntaxHighlighter, QTextCharFormat, QColor, QFont, QTextBlockFormat, QPainter, QPen, \
-	QTextDocument, QTextCursor
-from PyQt5.QtCore import QRegExp, pyqtSlot, Qt, QRect, QStringListModel, QEvent
+from PyQt5.QtGui import QSyntaxHighlighter, QTextCharFormat, QColor, QFont, QPainter, QPen, \
+	QTextDocument, QTextCursor, QTextBlockUserData, QPalette, QStandardItemModel, QStandardItem
+from PyQt5.QtCore import pyqtSlot, pyqtSignal, Qt, QRect, QPointF, QStringListModel, QEvent, QThread, QProcess, \
+	QTimer, QObject, QSocketNotifier, QModelIndex, QFileSystemWatcher
 import sys
 import os
 import json
@@ -33,6 +60,104 @@ elif IDESTATE == 5:
 else:
 	status = "Editing Something..."
 
+class StartupTrace:
+	"""
+	Prints per-phase wall-clock timings when TLITE is started with --startup-trace.
+	"""
+	def __init__(self, enabled=False):
+		self.enabled = enabled
+		self.start = time.perf_counter()
+		self.last = self.start
+
+	def mark(self, phase):
+		if not self.enabled:
+			return
+		now = time.perf_counter()
+		print(f"[startup] {phase}: {(now - self.last) * 1000:.1f} ms (total {(now - self.start) * 1000:.1f} ms)")
+		self.last = now
+
+
+STARTUP_TRACE = StartupTrace("--startup-trace" in sys.argv)
+
+
+class _StageTimer:
+	__slots__ = ("profiler", "stage", "start")
+
+	def __init__(self, profiler, stage):
+		self.profiler = profiler
+		self.stage = stage
+		self.start = 0.0
+
+	def __enter__(self):
+		self.start = time.perf_counter()
+		return self
+
+	def __exit__(self, *exc):
+		self.profiler.record(self.stage, (time.perf_counter() - self.start) * 1000.0)
+		return False
+
+
+class LatencyProfiler:
+	"""
+	Ring buffers of the most recent durations (ms) per keystroke-pipeline stage.
+	Disabled by default; while disabled, timed() and measure() cost one check.
+	"""
+	def __init__(self, size=512):
+		self.size = size
+		self.enabled = False
+		self.samples = {}
+		self._null = contextlib.nullcontext()
+
+	def record(self, stage, ms):
+		samples = self.samples.get(stage)
+		if samples is None:
+			samples = self.samples[stage] = deque(maxlen=self.size)
+		samples.append((time.time(), ms))
+
+	def measure(self, stage):
+		return _StageTimer(self, stage) if self.enabled else self._null
+
+	def timed(self, stage):
+		def decorator(fn):
+			@functools.wraps(fn)
+			def wrapper(*args, **kwargs):
+				if not self.enabled:
+					return fn(*args, **kwargs)
+				start = time.perf_counter()
+				try:
+					return fn(*args, **kwargs)
+				finally:
+					self.record(stage, (time.perf_counter() - start) * 1000.0)
+			return wrapper
+		return decorator
+
+	def percentiles(self, stage):
+		durations = sorted(ms for _, ms in self.samples.get(stage, ()))
+		if not durations:
+			return None
+		last = len(durations) - 1
+		return durations[last // 2], durations[min(last, int(len(durations) * 0.99))], durations[-1]
+
+	def clear(self):
+		self.samples.clear()
+
+	def dump(self, path):
+		"""
+		Writes every buffered sample as one JSON object per line and returns the count.
+		"""
+		os.makedirs(os.path.dirname(path), exist_ok=True)
+		count = 0
+		with open(path, "w", encoding="utf-8") as f:
+			for stage, samples in self.samples.items():
+				for timestamp, ms in samples:
+					f.write(json.dumps({"stage": stage, "time": timestamp, "ms": round(ms, 4)}) + "\n")
+					count += 1
+		return count
+
+
+LATENCY = LatencyProfiler()
+
+
 def resource_path(relative_path):
 	base_path = getattr(sys, '_MEIPASS', os.path.abspath("."))
 	return os.path.join(base_path, relative_path)
@@ -46,15 +171,14 @@ def get_user_config_path(filename):
 
 
 def setup_user_config():
-	if not os.path.exists(USER_CONFIG_DIR):
-		os.makedirs(USER_CONFIG_DIR, exist_ok=True)
-		default_config_dir = resource_path("config")
-		if os.path.isdir(default_config_dir):
-			for file in os.listdir(default_config_dir):
-				src = os.path.join(default_config_dir, file)
-				dst = os.path.join(USER_CONFIG_DIR, file)
-				if os.path.isfile(src):
-					shutil.copyfile(src, dst)
+	os.makedirs(USER_CONFIG_DIR, exist_ok=True)
+	default_config_dir = resource_path("config")
+	if os.path.isdir(default_config_dir):
+		for file in os.listdir(default_config_dir):
+			src = os.path.join(default_config_dir, file)
+			dst = os.path.join(USER_CONFIG_DIR, file)
+			if os.path.isfile(src) and not os.path.exists(dst):
+				shutil.copyfile(src, dst)
 
 class PlaceholderTab(QWidget):
 	def __init__(self):
@@ -122,39 +246,759 @@ class KeybindEditorDialog(QDialog):
 	def get_keybinds(self):
 		return self.keybinds
 
+_LINT_TOKEN_RE = re.compile(r"\w+")
+
+
+def _utf16_offsets(text):
+	"""
+	Maps str indices to the UTF-16 positions QSyntaxHighlighter.setFormat expects,
+	or returns None when they already agree (no characters outside the BMP).
+	"""
+	if text.isascii() or all(ord(ch) <= 0xFFFF for ch in text):
+		return None
+	offsets = [0] * (len(text) + 1)
+	pos = 0
+	for i, ch in enumerate(text):
+		offsets[i] = pos
+		pos += 2 if ord(ch) > 0xFFFF else 1
+	offsets[len(text)] = pos
+	return offsets
+
+
+_LINT_CACHE_MAGIC = b"TLINT-RULES-1\n"
+
+
+def lint_cache_path(path):
+	"""
+	Kept under its own directory so writing it never touches the watched config
+	directory listing.
+	"""
+	digest = hashlib.sha1(os.path.abspath(path).encode("utf-8", errors="surrogateescape")).hexdigest()
+	return os.path.join(USER_CONFIG_DIR, "rule_cache", digest + ".rulecache")
+
+
+class LintMatcher:
+	"""
+	Compiled form of linting.json. Single-word rules are one sorted list of
+	lowercased words with parallel arrays of palette index ('H') and rule order
+	('I'), searched with bisect: a block is tokenized once no matter how many
+	rules exist, and a dictionary-sized word list costs little more than its
+	strings. Colors are deduplicated into the palette. Rules that are not a
+	plain word (phrases, punctuation) fall back to a regex each.
+	"""
+	def __init__(self, palette, keys, colors, orders, phrase_rules=(), display=None):
+		self.palette = list(palette)
+		self.keys = keys
+		self.colors = colors
+		self.orders = orders
+		self.display = display or {}
+		self.phrase_rules = [tuple(rule) for rule in phrase_rules]
+		self.phrases = [(word, self.palette[color_idx]) for _, word, color_idx in self.phrase_rules]
+		self.patterns = [
+			(order, re.compile(f"\\b{re.escape(word)}\\b", re.IGNORECASE), color_idx)
+			for order, word, color_idx in self.phrase_rules
+		]
+		self._phrase_index = PrefixIndex((word, word) for word, _ in self.phrases)
+
+	@classmethod
+	def from_rules(cls, rules_data):
+		palette = []
+		palette_index = {}
+		latest = {}
+		phrase_rules = []
+		for order, rule in enumerate(rules_data):
+			word = rule.get("word", "")
+			if not word:
+				continue
+			color = rule.get("color", "#ff0000")
+			color_idx = palette_index.get(color)
+			if color_idx is None:
+				color_idx = palette_index[color] = len(palette)
+				palette.append(color)
+			if _LINT_TOKEN_RE.fullmatch(word):
+				# A later rule for the same word replaces the earlier one.
+				latest[word.lower()] = (order, color_idx, word)
+			else:
+				phrase_rules.append((order, word, color_idx))
+		keys = sorted(latest)
+		colors = array("H", (latest[key][1] for key in keys))
+		orders = array("I", (latest[key][0] for key in keys))
+		display = {key: latest[key][2] for key in keys if latest[key][2] != key}
+		return cls(palette, keys, colors, orders, phrase_rules, display)
+
+	def to_bytes(self, stamp):
+		"""
+		Binary cache image: magic line, JSON header line (source stamp, palette,
+		phrases, section sizes), then the newline-joined words and the raw arrays.
+		"""
+		blob = "\n".join(self.keys).encode("utf-8")
+		header = {
+			"stamp": list(stamp),
+			"count": len(self.keys),
+			"blob": len(blob),
+			"byteorder": sys.byteorder,
+			"itemsizes": [self.colors.itemsize, self.orders.itemsize],
+			"palette": self.palette,
+			"phrases": self.phrase_rules,
+			"display": self.display,
+		}
+		return b"".join((
+			_LINT_CACHE_MAGIC, json.dumps(header).encode("utf-8"), b"\n",
+			blob, self.colors.tobytes(), self.orders.tobytes()
+		))
+
+	@classmethod
+	def from_bytes(cls, data, stamp):
+		"""
+		Loads a to_bytes() image in time proportional to its size, or returns None
+		if it was written for a different source file or platform.
+		"""
+		if not data.startswith(_LINT_CACHE_MAGIC):
+			return None
+		header_end = data.index(b"\n", len(_LINT_CACHE_MAGIC))
+		header = json.loads(data[len(_LINT_CACHE_MAGIC):header_end])
+		colors = array("H")
+		orders = array("I")
+		if (header["stamp"] != list(stamp) or header["byteorder"] != sys.byteorder
+				or header["itemsizes"] != [colors.itemsize, orders.itemsize]):
+			return None
+		count = header["count"]
+		pos = header_end + 1
+		blob_end = pos + header["blob"]
+		keys = data[pos:blob_end].decode("utf-8").split("\n") if count else []
+		colors_end = blob_end + count * colors.itemsize
+		colors.frombytes(data[blob_end:colors_end])
+		orders.frombytes(data[colors_end:colors_end + count * orders.itemsize])
+		if len(keys) != count or len(orders) != count:
+			return None
+		return cls(header["palette"], keys, colors, orders, header["phrases"], header["display"])
+
+	def lookup(self, prefix):
+		"""
+		Rule words starting with `prefix`, same interface as PrefixIndex.lookup.
+		"""
+		prefix = prefix.lower()
+		keys = self.keys
+		i = bisect.bisect_left(keys, prefix)
+		results = []
+		while i < len(keys) and keys[i].startswith(prefix):
+			results.append(self.display.get(keys[i], keys[i]))
+			i += 1
+		results.extend(self._phrase_index.lookup(prefix))
+		return results
+
+	def match(self, text, tokens=None):
+		"""
+		Returns (start, length, palette index) spans in rule order, so a later rule
+		still wins where spans overlap, exactly like applying the rules one by one.
+		If `tokens` is a set, every lowercased word of the text is added to it.
+		"""
+		spans = []
+		keys = self.keys
+		if keys or tokens is not None:
+			count = len(keys)
+			colors, orders = self.colors, self.orders
+			bisect_left = bisect.bisect_left
+			for m in _LINT_TOKEN_RE.finditer(text):
+				word = m.group().lower()
+				if tokens is not None:
+					tokens.add(word)
+				i = bisect_left(keys, word)
+				if i < count and keys[i] == word:
+					spans.append((orders[i], m.start(), m.end() - m.start(), colors[i]))
+		for order, pattern, color_idx in self.patterns:
+			for m in pattern.finditer(text):
+				if m.end() > m.start():
+					spans.append((order, m.start(), m.end() - m.start(), color_idx))
+		if self.patterns:
+			spans.sort()
+		return [(start, length, color_idx) for _, start, length, color_idx in spans]
+
+
+class PrefixIndex:
+	"""
+	Sorted (key, value) arrays searched with bisect, so a prefix lookup costs
+	O(log n + k) instead of a scan over every entry.
+	"""
+	def __init__(self, pairs):
+		pairs = sorted((key.lower(), value) for key, value in pairs if key)
+		self.keys = [key for key, _ in pairs]
+		self.values = [value for _, value in pairs]
+
+	def lookup(self, prefix):
+		prefix = prefix.lower()
+		keys = self.keys
+		i = bisect.bisect_left(keys, prefix)
+		results = []
+		while i < len(keys) and keys[i].startswith(prefix):
+			results.append(self.values[i])
+			i += 1
+		return results
+
+
+def build_instaplace_index(rules):
+	pairs = []
+	for rule in rules:
+		find = rule.get("find", "")
+		replace = rule.get("replace", "")
+		pairs.append((find, replace))
+		pairs.append((replace, replace))
+	return PrefixIndex(pairs)
+
+
+class InstaplaceEngine:
+	"""
+	Compiled instaplace rules. Plain-word triggers resolve through a dict; triggers
+	with spaces or punctuation are matched by an Aho-Corasick automaton run over
+	the text just before the cursor. The first rule for a trigger wins.
+	"""
+	def __init__(self, rules):
+		self.words = {}
+		self.max_phrase = 0
+		self._goto = [{}]
+		self._fail = [0]
+		self._out = [None]
+		order = 0
+		for rule in rules:
+			find = rule.get("find", "")
+			replace = rule.get("replace", "")
+			if not find:
+				continue
+			if _LINT_TOKEN_RE.fullmatch(find):
+				self.words.setdefault(find, replace)
+			else:
+				self._add_phrase(find, replace, order)
+				self.max_phrase = max(self.max_phrase, len(find))
+			order += 1
+		self._build_links()
+
+	def _add_phrase(self, find, replace, order):
+		node = 0
+		for ch in find:
+			nxt = self._goto[node].get(ch)
+			if nxt is None:
+				nxt = len(self._goto)
+				self._goto[node][ch] = nxt
+				self._goto.append({})
+				self._fail.append(0)
+				self._out.append(None)
+			node = nxt
+		if self._out[node] is None:
+			self._out[node] = (order, find, replace)
+
+	def _build_links(self):
+		self._dict_link = [0] * len(self._goto)
+		queue = list(self._goto[0].values())
+		for node in queue:
+			for ch, child in self._goto[node].items():
+				fail = self._fail[node]
+				while fail and ch not in self._goto[fail]:
+					fail = self._fail[fail]
+				target = self._goto[fail].get(ch, 0)
+				self._fail[child] = target if target != child else 0
+				self._dict_link[child] = target if self._out[target] is not None else self._dict_link[target]
+				queue.append(child)
+
+	def match_word(self, word):
+		return self.words.get(word)
+
+	def match_phrase_before(self, text):
+		"""
+		Returns (find, replace) for the earliest-defined phrase trigger that ends
+		exactly at the end of text and starts on a word boundary, else None.
+		"""
+		if not self.max_phrase or not text:
+			return None
+		node = 0
+		goto, fail = self._goto, self._fail
+		for ch in text[-self.max_phrase:]:
+			while node and ch not in goto[node]:
+				node = fail[node]
+			node = goto[node].get(ch, 0)
+
+		best = None
+		if self._out[node] is None:
+			node = self._dict_link[node]
+		while node:
+			order, find, replace = self._out[node]
+			start = len(text) - len(find)
+			boundary = start == 0 or not (_LINT_TOKEN_RE.match(find[0]) and _LINT_TOKEN_RE.match(text[start - 1]))
+			if boundary and (best is None or order < best[0]):
+				best = (order, find, replace)
+			node = self._dict_link[node]
+		return best[1:] if best else None
+
+
+class LintRuleSet:
+	"""
+	Immutable compiled rules for one linting.json, shared by every highlighter.
+	source is (cache path, stamp) when the binary cache holds exactly these
+	rules, which is what lets lint worker processes load them.
+	"""
+	def __init__(self, matcher, source=None):
+		self.matcher = matcher
+		self.source = source
+		formats = []
+		for color in self.matcher.palette:
+			fmt = QTextCharFormat()
+			fmt.setForeground(QColor(color))
+			formats.append(fmt)
+		self.formats = tuple(formats)
+
+	@classmethod
+	def from_rules(cls, rules_data):
+		return cls(LintMatcher.from_rules(rules_data))
+
+	@property
+	def words(self):
+		"""
+		Every rule word in rule order, rebuilt on demand rather than kept twice.
+		"""
+		matcher = self.matcher
+		entries = [(order, matcher.display.get(key, key)) for key, order in zip(matcher.keys, matcher.orders)]
+		entries.extend((order, word) for order, word, _ in matcher.phrase_rules)
+		entries.sort()
+		return tuple(word for _, word in entries)
+
+	@property
+	def prefix_index(self):
+		return self.matcher
+
+	def _signature(self):
+		"""
+		word -> (color, phrase rules defined before it), plus the phrase rules in
+		order. Two rule sets with equal signatures highlight every block the same.
+		"""
+		matcher = self.matcher
+		palette = matcher.palette
+		phrase_orders = [order for order, _, _ in matcher.phrase_rules]
+		words = {
+			key: (palette[color_idx], bisect.bisect(phrase_orders, order))
+			for key, color_idx, order in zip(matcher.keys, matcher.colors, matcher.orders)
+		}
+		return words, matcher.phrases
+
+	def changed_words(self, other):
+		"""
+		Lowercased words whose highlighting differs between this rule set and
+		`other`: rules added, removed or recolored, plus the words of any phrase
+		rule if the phrases changed. None means a phrase has no word to look
+		blocks up by, so every block has to be redone.
+		"""
+		old_words, old_phrases = self._signature()
+		new_words, new_phrases = other._signature()
+		changed = set(old_words.keys() ^ new_words.keys())
+		changed.update(word for word, sig in new_words.items() if word in old_words and old_words[word] != sig)
+		if old_phrases != new_phrases:
+			for phrase, _ in old_phrases + new_phrases:
+				phrase_words = _LINT_TOKEN_RE.findall(phrase.lower())
+				if not phrase_words:
+					return None
+				changed.update(phrase_words)
+		return changed
+
+
+def file_stamp(path):
+	try:
+		st = os.stat(path)
+		return st.st_mtime_ns, st.st_size
+	except OSError:
+		return None
+
+
+class LintRuleRegistry:
+	"""
+	Process-wide cache of LintRuleSets keyed by path; an entry is recompiled only
+	when the file's mtime/size changes or reload() is called.
+	"""
+	def __init__(self):
+		self._entries = {}
+
+	@staticmethod
+	def _compile(path):
+		"""
+		Loads the binary cache for `path` when it was built from the file as it
+		is now; otherwise parses the JSON and rewrites the cache.
+		"""
+		stamp = file_stamp(path)
+		cache_path = lint_cache_path(path)
+		if stamp is not None and os.path.exists(cache_path):
+			try:
+				with open(cache_path, "rb") as f:
+					matcher = LintMatcher.from_bytes(f.read(), stamp)
+				if matcher is not None:
+					return LintRuleSet(matcher, (cache_path, stamp))
+			except (OSError, ValueError, KeyError, TypeError) as e:
+				print("Linter rule cache unreadable, rebuilding:", e)
+
+		rules_data = []
+		try:
+			if os.path.exists(path):
+				with open(path, "r", encoding="utf-8") as file:
+					rules_data = json.load(file)
+		except Exception as e:
+			print("Linter rules load error:", e)
+		matcher = LintMatcher.from_rules(rules_data)
+		source = None
+		if stamp is not None:
+			tmp_path = cache_path + ".tmp"
+			try:
+				os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+				with open(tmp_path, "wb") as f:
+					f.write(matcher.to_bytes(stamp))
+				os.replace(tmp_path, cache_path)
+				source = (cache_path, stamp)
+			except OSError as e:
+				print("Could not write linter rule cache:", e)
+		return LintRuleSet(matcher, source)
+
+	def get(self, path):
+		stamp = file_stamp(path)
+		entry = self._entries.get(path)
+		if entry is None or entry[0] != stamp:
+			entry = (stamp, self._compile(path))
+			self._entries[path] = entry
+		return entry[1]
+
+	def reload(self, path):
+		self._entries.pop(path, None)
+		return self.get(path)
+
+
+LINT_RULES = LintRuleRegistry()
+
+_LINT_SYNC_SECONDS = 0.004
+_LINT_BATCH_BLOCKS = 256
+_LINT_MAX_BATCHES = 4
+_lint_pool = None
+_lint_worker_matchers = {}
+
+
+def lint_block_batch(cache_path, stamp, jobs):
+	"""
+	Process-pool worker: matches [(block number, revision, text), ...] against the
+	rules in the binary cache and returns [(block number, revision, spans, words),
+	...], or None if the cache no longer holds the rules stamped `stamp`.
+	"""
+	key = (cache_path, tuple(stamp))
+	matcher = _lint_worker_matchers.get(key)
+	if matcher is None:
+		try:
+			with open(cache_path, "rb") as f:
+				matcher = LintMatcher.from_bytes(f.read(), stamp)
+		except (OSError, ValueError, KeyError, TypeError):
+			matcher = None
+		if matcher is None:
+			return None
+		# Only the current rules are ever asked for again.
+		_lint_worker_matchers.clear()
+		_lint_worker_matchers[key] = matcher
+	results = []
+	for number, revision, text in jobs:
+		words = set()
+		spans = matcher.match(text, words)
+		results.append((number, revision, spans, words))
+	return results
+
+
+def get_lint_pool():
+	global _lint_pool
+	if _lint_pool is None:
+		# One core is left for the GUI thread that applies the results.
+		_lint_pool = ProcessPoolExecutor(max_workers=max(1, (os.cpu_count() or 2) - 1), mp_context=multiprocessing.get_context("spawn"))
+		atexit.register(_lint_pool.shutdown, wait=False, cancel_futures=True)
+	return _lint_pool
+
+
 class EnglishLinter(QSyntaxHighlighter):
+	"""
+	Each event-loop tick may spend _LINT_SYNC_SECONDS inside highlightBlock;
+	blocks past that budget (a big paste, a full rehighlight) are matched by the
+	lint worker pool and their formats applied in idle slices when the results
+	come back, if the block still has the revision and text that was sent.
+	"""
+	lint_ready = pyqtSignal(object, object, object)
+
 	def __init__(self, document, rules_path=get_user_config_path("linting.json")):
 		super().__init__(document)
 		self.rules_path = rules_path
-		self.rules = []
-		self.load_rules()
+		self.rule_set = LINT_RULES.get(self.rules_path)
+		self.word_blocks = {}
+		self.eager_blocks = None
+		self.sync_depth = 0
+		self.burst_spent = None
+		self.queued = deque()
+		self.in_flight = 0
+		self.ready = deque()
+		self.applying = None
+		self.burst_timer = QTimer(self)
+		self.burst_timer.setSingleShot(True)
+		self.burst_timer.setInterval(0)
+		self.burst_timer.timeout.connect(self._end_burst)
+		self.apply_timer = QTimer(self)
+		self.apply_timer.setInterval(0)
+		self.apply_timer.timeout.connect(self._apply_results)
+		self.lint_ready.connect(self._on_lint_ready)
+		self.default_format = QTextCharFormat()
+		self.default_format.setForeground(QColor("white"))
+		self.rehighlight()
 
 	def load_rules(self):
 		try:
-			self.rules.clear()
-			if os.path.exists(self.rules_path):
-				with open(self.rules_path, "r", encoding="utf-8") as file:
-					rules_data = json.load(file)
-					for rule in rules_data:
-						fmt = QTextCharFormat()
-						fmt.setForeground(QColor(rule.get("color", "#ff0000")))
-						regex = QRegExp(f"\\b{re.escape(rule['word'])}\\b", Qt.CaseInsensitive)
-						self.rules.append((regex, fmt))
-			self.rehighlight()
+			self.set_rule_set(LINT_RULES.get(self.rules_path))
 		except Exception as e:
 			print("Linter load_rules error:", e)
 
+	def set_rule_set(self, rule_set):
+		self.rule_set = rule_set
+		self.rehighlight()
+
+	@contextlib.contextmanager
+	def quiet(self):
+		"""
+		rehighlightBlock() wraps each block in its own edit block, so the document
+		reports a text change every time and textChanged listeners (counters,
+		instaplace) would run per block. Formats still reach the layout.
+		"""
+		doc = self.document()
+		blocked = doc.blockSignals(True)
+		try:
+			yield
+		finally:
+			doc.blockSignals(blocked)
+
+	@contextlib.contextmanager
+	def synchronous(self):
+		"""
+		Matches every block on this thread while active, for callers that already
+		pace themselves or need the formats immediately.
+		"""
+		self.sync_depth += 1
+		try:
+			yield
+		finally:
+			self.sync_depth -= 1
+
+	@property
+	def busy(self):
+		return bool(self.queued or self.in_flight or self.ready)
+
+	def update_rule_set(self, rule_set):
+		"""
+		Switches to `rule_set` and rehighlights only the blocks containing a word
+		whose rule changed. Returns the number of blocks rehighlighted.
+		"""
+		old = self.rule_set
+		if rule_set is old:
+			return 0
+		self.rule_set = rule_set
+		changed = old.changed_words(rule_set)
+		if changed is None:
+			self.rehighlight()
+			return self.document().blockCount()
+		# How many (block, changed word) pairs exist; the walk stops once all are found.
+		remaining = sum(self.word_blocks.get(word, 0) for word in changed)
+		count = 0
+		block = self.document().firstBlock()
+		with self.quiet():
+			while remaining > 0 and block.isValid():
+				data = block.userData()
+				if isinstance(data, EditorBlockData) and data.words and not changed.isdisjoint(data.words):
+					remaining -= len(changed & data.words)
+					self.rehighlightBlock(block)
+					count += 1
+				block = block.next()
+		return count
+
+	def _index_block_words(self, words):
+		"""
+		Records the block's words on its user data and keeps word_blocks, the
+		number of blocks each word appears in, in step. Deleted blocks are never
+		subtracted, so counts can only overstate, which costs at most a wasted
+		walk in update_rule_set.
+		"""
+		data = self.currentBlockUserData()
+		if not isinstance(data, EditorBlockData):
+			data = EditorBlockData()
+			self.setCurrentBlockUserData(data)
+		old = data.words
+		if old == words:
+			return
+		counts = self.word_blocks
+		if old:
+			for word in old - words:
+				left = counts.get(word, 1) - 1
+				if left > 0:
+					counts[word] = left
+				else:
+					counts.pop(word, None)
+			words_added = words - old
+		else:
+			words_added = words
+		for word in words_added:
+			counts[word] = counts.get(word, 0) + 1
+		data.words = words
+
+	def is_highlighted(self, block):
+		data = block.userData()
+		return isinstance(data, EditorBlockData) and data.words is not None
+
+	@LATENCY.timed("highlight")
 	def highlightBlock(self, text):
-		default_format = QTextCharFormat()
-		default_format.setForeground(QColor("white"))
-		self.setFormat(0, len(text), default_format)
+		started = time.perf_counter()
+		try:
+			self._highlight_block(text)
+		finally:
+			if self.burst_spent is not None:
+				self.burst_spent += time.perf_counter() - started
+
+	def _highlight_block(self, text):
+		if self.eager_blocks is not None:
+			# Loading under DeferredHighlighter: only the first blocks are done now.
+			if self.eager_blocks <= 0:
+				return
+			self.eager_blocks -= 1
+		offsets = _utf16_offsets(text)
+		self.setFormat(0, len(text) if offsets is None else offsets[-1], self.default_format)
+
+		rule_set = self.rule_set
+		if self.applying is not None:
+			spans, words = self.applying
+			self.applying = None
+		elif self._over_budget(rule_set):
+			self._queue_block(text)
+			return
+		else:
+			words = set()
+			spans = rule_set.matcher.match(text, words)
+		self._index_block_words(words)
+		if not spans:
+			return
+		formats = rule_set.formats
+		for start, length, color_idx in spans:
+			if offsets is not None:
+				start, length = offsets[start], offsets[start + length] - offsets[start]
+			self.setFormat(start, length, formats[color_idx])
+
+	def _over_budget(self, rule_set):
+		"""
+		Only time spent highlighting counts, not time elsewhere in the same tick,
+		so a small document never outruns the budget and starts the workers.
+		"""
+		if self.sync_depth or rule_set.source is None:
+			return False
+		if self.burst_spent is None:
+			self.burst_spent = 0.0
+			self.burst_timer.start()
+			return False
+		return self.burst_spent >= _LINT_SYNC_SECONDS
+
+	def _queue_block(self, text):
+		"""
+		Leaves the block plain for now and queues it for the workers. The job
+		rides on the block's user data, so it follows the block when lines are
+		inserted above it and a newer job for the same block supersedes it.
+		"""
+		block = self.currentBlock()
+		data = self.currentBlockUserData()
+		if not isinstance(data, EditorBlockData):
+			data = EditorBlockData()
+			self.setCurrentBlockUserData(data)
+		revision = block.revision()
+		job = data.lint_job
+		if job is not None and job[0] == revision and job[1] == text:
+			return
+		data.lint_job = (revision, text)
+		self.queued.append((block, data.lint_job))
+
+	def _end_burst(self):
+		self.burst_spent = None
+		self._submit_batches()
+
+	def _job_is_current(self, block, job):
+		data = block.userData() if block.isValid() else None
+		return isinstance(data, EditorBlockData) and data.lint_job is job
+
+	def _submit_batches(self):
+		"""
+		Keeps at most _LINT_MAX_BATCHES batches out at a time, like ProjectSearch,
+		so a huge paste is pickled and applied as a stream rather than in one burst.
+		Jobs superseded while they waited here are dropped.
+		"""
+		queued = self.queued
+		rule_set = self.rule_set
+		if rule_set.source is None:
+			self.ready.extend((rule_set, block, job, None) for block, job in queued)
+			queued.clear()
+			if self.ready:
+				self.apply_timer.start()
+			return
+		cache_path, stamp = rule_set.source
+		while queued and self.in_flight < _LINT_MAX_BATCHES:
+			batch = []
+			while queued and len(batch) < _LINT_BATCH_BLOCKS:
+				block, job = queued.popleft()
+				if self._job_is_current(block, job):
+					batch.append((block, job))
+			if not batch:
+				break
+			jobs = [(block.blockNumber(), revision, text) for block, (revision, text) in batch]
+			try:
+				future = get_lint_pool().submit(lint_block_batch, cache_path, stamp, jobs)
+			except RuntimeError as e:  # BrokenProcessPool, or the pool is shutting down
+				print("Lint worker pool unavailable:", e)
+				self.ready.extend((rule_set, block, job, None) for block, job in batch + list(queued))
+				queued.clear()
+				self.apply_timer.start()
+				return
+			self.in_flight += 1
+			future.add_done_callback(functools.partial(self._on_worker_done, rule_set, batch))
 
-		for pattern, fmt in self.rules:
-			index = pattern.indexIn(text)
-			while index >= 0:
-				length = pattern.matchedLength()
-				self.setFormat(index, length, fmt)
-				index = pattern.indexIn(text, index + length)
+	def _on_worker_done(self, rule_set, batch, future):
+		"""
+		Runs on the pool's thread; the signal carries the result to the GUI thread.
+		"""
+		results = None
+		if not future.cancelled():
+			try:
+				results = future.result()
+			except Exception as e:
+				print("Lint worker error:", e)
+		try:
+			self.lint_ready.emit(rule_set, batch, results)
+		except RuntimeError:
+			pass  # The tab was closed while the batch was out.
+
+	def _on_lint_ready(self, rule_set, batch, results):
+		self.in_flight -= 1
+		if results is None:
+			# The worker could not load these rules; match on this thread instead.
+			results = [None] * len(batch)
+		self.ready.extend((rule_set, block, job, result) for (block, job), result in zip(batch, results))
+		self.apply_timer.start()
+		self._submit_batches()
+
+	def _apply_results(self):
+		deadline = time.perf_counter() + _HIGHLIGHT_SLICE_SECONDS
+		ready = self.ready
+		with self.quiet():
+			while ready and time.perf_counter() < deadline:
+				rule_set, block, job, result = ready.popleft()
+				if not self._job_is_current(block, job):
+					continue  # Edited again since, and requeued or highlighted then.
+				block.userData().lint_job = None
+				revision, text = job
+				if block.revision() != revision:
+					continue
+				if result is not None and rule_set is self.rule_set:
+					self.applying = (result[2], result[3])
+				else:
+					words = set()
+					self.applying = (self.rule_set.matcher.match(text, words), words)
+				self.rehighlightBlock(block)
+				self.applying = None
+		if not ready:
+			self.apply_timer.stop()
 
 	def load_rules_from_file(self):
 		try:
@@ -167,10 +1011,168 @@ class EnglishLinter(QSyntaxHighlighter):
 			return []
 
 	def get_words(self):
+		return list(self.rule_set.words)
+
+	def complete(self, prefix):
+		return self.rule_set.prefix_index.lookup(prefix)
+
+
+_EAGER_HIGHLIGHT_BLOCKS = 200
+_VIEWPORT_MARGIN_BLOCKS = 50
+_HIGHLIGHT_SLICE_SECONDS = 0.008
+
+
+class DeferredHighlighter(QObject):
+	"""
+	Loads text into an editor with only its first blocks highlighted, then
+	finishes the rest in idle time slices. Whenever the view scrolls, the blocks
+	around the viewport are done first; otherwise a sweep works top to bottom.
+	"""
+	finished = pyqtSignal()
+
+	def __init__(self, linter, editor):
+		super().__init__(editor)
+		self.linter = linter
+		self.editor = editor
+		self.document = editor.document()
+		self.sweep = 0
+		self.block_count = 0
+		self.viewport_dirty = False
+		self.timer = QTimer(self)
+		self.timer.setInterval(0)
+		self.timer.timeout.connect(self._run_slice)
+		editor.verticalScrollBar().valueChanged.connect(self._on_viewport_changed)
+		self.document.contentsChange.connect(self._on_contents_change)
+
+	@property
+	def active(self):
+		return self.timer.isActive()
+
+	def load(self, text):
+		self.linter.eager_blocks = _EAGER_HIGHLIGHT_BLOCKS
 		try:
-			return [r.get("word", "") for r in self.load_rules_from_file()]
-		except Exception:
-			return []
+			with self.linter.synchronous():
+				self.editor.setPlainText(text)
+		finally:
+			self.linter.eager_blocks = None
+		self.block_count = self.document.blockCount()
+		self.sweep = 0
+		self.viewport_dirty = True
+		self.timer.start()
+
+	def _on_viewport_changed(self, *_):
+		if self.timer.isActive():
+			self.viewport_dirty = True
+
+	def _on_contents_change(self, position, removed, added):
+		"""
+		Keeps the sweep on the same block when lines are added or removed above it.
+		"""
+		count = self.document.blockCount()
+		delta = count - self.block_count
+		self.block_count = count
+		if delta and self.timer.isActive() and self.document.findBlock(position).blockNumber() < self.sweep:
+			self.sweep = max(0, self.sweep + delta)
+
+	def _highlight_from(self, block, limit, deadline=None):
+		linter = self.linter
+		with linter.quiet(), linter.synchronous():
+			while block.isValid() and limit > 0:
+				if not linter.is_highlighted(block):
+					linter.rehighlightBlock(block)
+				block = block.next()
+				limit -= 1
+				if deadline is not None and time.perf_counter() >= deadline:
+					break
+		return block
+
+	def _run_slice(self):
+		deadline = time.perf_counter() + _HIGHLIGHT_SLICE_SECONDS
+		if self.viewport_dirty:
+			self.viewport_dirty = False
+			block = self.editor.firstVisibleBlock()
+			for _ in range(_VIEWPORT_MARGIN_BLOCKS):
+				if not block.previous().isValid():
+					break
+				block = block.previous()
+			visible = self.editor.viewport().height() // max(1, self.editor.fontMetrics().lineSpacing()) + 1
+			self._highlight_from(block, visible + 2 * _VIEWPORT_MARGIN_BLOCKS)
+
+		block = self._highlight_from(self.document.findBlockByNumber(self.sweep), self.document.blockCount(), deadline)
+		if block.isValid():
+			self.sweep = block.blockNumber()
+		else:
+			self.timer.stop()
+			self.finished.emit()
+
+
+_BRACKET_RE = re.compile(r"[()\[\]{}]")
+_BRACKET_PAIRS = {'(': ')', '[': ']', '{': '}', ')': '(', ']': '[', '}': '{'}
+_OPENING_BRACKETS = '([{'
+_EAGER_BRACKET_BLOCKS = 64
+_BRACKET_CHUNK_BLOCKS = 256
+
+
+class EditorBlockData(QTextBlockUserData):
+	"""
+	Per-block summary of the brackets in a block, stamped with the block revision.
+	depth maps an opening bracket to (net, min prefix depth, min suffix depth) so a
+	matching scan can step over the whole block without looking at its text.
+	words is the set of lowercased words the highlighter last saw in the block.
+	lint_job is the (revision, text) sent to the lint workers, while it is out.
+	"""
+	def __init__(self):
+		super().__init__()
+		self.revision = -1
+		self.length = -1
+		self.brackets = ()
+		self.depth = {}
+		self.words = None
+		self.lint_job = None
+
+
+def block_bracket_data(block):
+	data = block.userData()
+	if not isinstance(data, EditorBlockData):
+		data = EditorBlockData()
+		block.setUserData(data)
+	if data.revision == block.revision() and data.length == block.length():
+		return data
+
+	text = block.text()
+	offsets = _utf16_offsets(text)
+	brackets = []
+	for m in _BRACKET_RE.finditer(text):
+		start = m.start() if offsets is None else offsets[m.start()]
+		brackets.append((start, m.group()))
+
+	depth = {}
+	for open_ch in _OPENING_BRACKETS:
+		close_ch = _BRACKET_PAIRS[open_ch]
+		kinds = [ch for _, ch in brackets if ch == open_ch or ch == close_ch]
+		if not kinds:
+			continue
+		net = min_prefix = 0
+		for ch in kinds:
+			net += 1 if ch == open_ch else -1
+			min_prefix = min(min_prefix, net)
+		back = min_suffix = 0
+		for ch in reversed(kinds):
+			back += 1 if ch == close_ch else -1
+			min_suffix = min(min_suffix, back)
+		depth[open_ch] = (net, min_prefix, min_suffix)
+
+	data.revision = block.revision()
+	data.length = block.length()
+	data.brackets = tuple(brackets)
+	data.depth = depth
+	return data
+
+
+def _combine_bracket_depth(first, second):
+	net_a, prefix_a, suffix_a = first
+	net_b, prefix_b, suffix_b = second
+	return net_a + net_b, min(prefix_a, net_a + prefix_b), min(suffix_b, suffix_a - net_b)
 
 
 class FindReplaceDock(QDockWidget):
@@ -206,9 +1208,105 @@ class FindReplaceDock(QDockWidget):
 		self.setWidget(container)
 
 
+_REPLACE_CHUNK_BLOCKS = 2000
+_REPLACE_PROGRESS_CHARS = 1000000
+
+
+def find_document_matches(document, pattern, on_progress=None):
+	"""
+	Scans the document block by block and returns (position, length) pairs in
+	document coordinates. on_progress(blocks_done) is called after every chunk of
+	blocks and may return False to cancel, in which case None is returned.
+	"""
+	matches = []
+	block = document.firstBlock()
+	done = 0
+	while block.isValid():
+		text = block.text()
+		offsets = None
+		for m in pattern.finditer(text):
+			if m.end() == m.start():
+				continue
+			if offsets is None:
+				offsets = _utf16_offsets(text) or False
+			start, end = (offsets[m.start()], offsets[m.end()]) if offsets else (m.start(), m.end())
+			matches.append((block.position() + start, end - start))
+		done += 1
+		if on_progress and done % _REPLACE_CHUNK_BLOCKS == 0 and on_progress(done) is False:
+			return None
+		block = block.next()
+	return matches
+
+
+def find_text_matches(document, pattern):
+	"""
+	Like find_document_matches, but scans the whole plain text at once so a
+	pattern containing a newline can match across blocks.
+	"""
+	text = document.toPlainText()
+	offsets = _utf16_offsets(text)
+	matches = []
+	for m in pattern.finditer(text):
+		if m.end() == m.start():
+			continue
+		start, end = (offsets[m.start()], offsets[m.end()]) if offsets else (m.start(), m.end())
+		matches.append((start, end - start))
+	return matches
+
+
+class SpacedDocumentLayout(QPlainTextDocumentLayout):
+	"""
+	Plain-text layout with one line spacing factor for the whole document.
+	QPlainTextDocumentLayout ignores QTextBlockFormat.lineHeight, so each
+	wrapped line of a block is moved down to its spaced position when the
+	block's rect is asked for; the editor paints, hit-tests and scrolls through
+	those lines, and changing the factor never touches the document.
+	"""
+	def __init__(self, document):
+		super().__init__(document)
+		self.line_spacing = 1.0
+		self.spaced = False
+
+	def set_line_spacing(self, spacing):
+		self.line_spacing = spacing
+		self.spaced = self.spaced or spacing != 1.0
+		self.requestUpdate()
+		self.documentSizeChanged.emit(self.documentSize())
+
+	def blockBoundingRect(self, block):
+		rect = super().blockBoundingRect(block)
+		if not self.spaced or not block.isVisible():
+			return rect
+		# The base layout stacks lines at their natural height whenever it lays
+		# the block out again, so positions are recomputed the same way it
+		# steps them and only written back when they differ.
+		layout = block.layout()
+		y = 0.0
+		moved = False
+		step = 0.0
+		for i in range(layout.lineCount()):
+			line = layout.lineAt(i)
+			if line.y() != y:
+				line.setPosition(QPointF(line.x(), y))
+				moved = True
+			step = line.height()
+			if line.leading() < 0:
+				step += math.ceil(line.leading())
+			y += step * self.line_spacing
+		if moved:
+			rect = super().blockBoundingRect(block)
+		rect.setHeight(rect.height() + step * (self.line_spacing - 1.0))
+		return rect
+
+
 class CustomTextEdit(QPlainTextEdit):
 	def __init__(self, plain_paste_callback=None, parent_tab=None, *args, **kwargs):
 		super().__init__(*args, **kwargs)
+		document = QTextDocument(self)
+		document.setDefaultFont(self.font())
+		self.spaced_layout = SpacedDocumentLayout(document)
+		document.setDocumentLayout(self.spaced_layout)
+		self.setDocument(document)
 		self.parent_tab = parent_tab
 		self.get_plain_paste_enabled = plain_paste_callback
 		self.completer = QCompleter()
@@ -220,8 +1318,17 @@ class CustomTextEdit(QPlainTextEdit):
 		self.completer.setModel(self.model)
 
 		self.match_info = None
+		self._bracket_chunks = {}
+		self._bracket_block_count = self.document().blockCount()
 
 		self.cursorPositionChanged.connect(self._on_cursor_moved)
+		self.document().contentsChange.connect(self._on_contents_change)
+
+	def line_spacing(self):
+		return self.spaced_layout.line_spacing
+
+	def set_line_spacing(self, spacing):
+		self.spaced_layout.set_line_spacing(spacing)
 
 	def paste(self):
 		if self.get_plain_paste_enabled and self.get_plain_paste_enabled():
@@ -232,23 +1339,18 @@ class CustomTextEdit(QPlainTextEdit):
 			super().paste()
 
 	def generateInstaplaceSuggestions(self, word):
-		suggestions = set()
-
-		word = word.lower()
+		rule_words = []
 
 		if self.parent_tab and getattr(self.parent_tab, "instaplace_rules", None):
-			for rule in self.parent_tab.instaplace_rules:
-				find = rule["find"].lower()
-				replace = rule["replace"]
-				if find.startswith(word) or replace.lower().startswith(word):
-					suggestions.add(replace)
+			index = getattr(self.parent_tab, "instaplace_index", None)
+			if index is not None:
+				rule_words.extend(index.lookup(word))
 
-		if hasattr(self.parent(), "linter"):
-			for lint_word in self.parent().linter.get_words():
-				if lint_word.lower().startswith(word):
-					suggestions.add(lint_word)
+		linter = getattr(self.parent_tab, "linter", None)
+		if linter is not None:
+			rule_words.extend(linter.complete(word))
 
-		return list(suggestions)
+		return BUFFER_WORDS.complete(word, rule_words)
 
 	def insertCompletion(self, completion):
 		tc = self.textCursor()
@@ -257,6 +1359,7 @@ class CustomTextEdit(QPlainTextEdit):
 		tc.insertText(completion)
 		self.setTextCursor(tc)
 
+	@LATENCY.timed("keypress")
 	def keyPressEvent(self, event):
 		if self.parent_tab and not getattr(self.parent_tab, "suggestions_enabled", True):
 			super().keyPressEvent(event)
@@ -370,26 +1473,52 @@ class CustomTextEdit(QPlainTextEdit):
 		if not current_word or current_word.isspace():
 			self.completer.popup().hide()
 		else:
-			suggestions = self.generateInstaplaceSuggestions(current_word)
-			if suggestions:
-				self.model.setStringList(suggestions)
-				self.completer.setCompletionPrefix(current_word)
-				rect = self.cursorRect()
-				popup = self.completer.popup()
-				popup_size = popup.sizeHintForColumn(0) + 20
-				popup.setFixedWidth(popup_size)
-				self.completer.complete(rect)
-			else:
-				self.completer.popup().hide()
+			with LATENCY.measure("suggestions"):
+				suggestions = self.generateInstaplaceSuggestions(current_word)
+				if suggestions:
+					self.model.setStringList(suggestions)
+					self.completer.setCompletionPrefix(current_word)
+					rect = self.cursorRect()
+					popup = self.completer.popup()
+					popup_size = popup.sizeHintForColumn(0) + 20
+					popup.setFixedWidth(popup_size)
+					self.completer.complete(rect)
+				else:
+					self.completer.popup().hide()
 
 	def _on_cursor_moved(self):
 		self._update_bracket_matches()
 
+	def _on_contents_change(self, position, removed, added):
+		doc = self.document()
+		block = doc.findBlock(position)
+		end_block = doc.findBlock(position + added)
+		if not end_block.isValid():
+			end_block = doc.lastBlock()
+
+		first_chunk = block.blockNumber() // _BRACKET_CHUNK_BLOCKS
+		if doc.blockCount() != self._bracket_block_count:
+			self._bracket_block_count = doc.blockCount()
+			last_chunk = max(self._bracket_chunks, default=first_chunk)
+		else:
+			last_chunk = end_block.blockNumber() // _BRACKET_CHUNK_BLOCKS
+		for chunk in range(first_chunk, last_chunk + 1):
+			self._bracket_chunks.pop(chunk, None)
+
+		if end_block.blockNumber() - block.blockNumber() > _EAGER_BRACKET_BLOCKS:
+			return
+		while block.isValid():
+			block_bracket_data(block)
+			if block == end_block:
+				break
+			block = block.next()
+
+	@LATENCY.timed("brackets")
 	def _update_bracket_matches(self):
-		txt = self.toPlainText()
+		doc = self.document()
 		pos = self.textCursor().position()
-		length = len(txt)
-		if length == 0:
+		length = doc.characterCount() - 1
+		if length <= 0:
 			self.match_info = None
 			self._apply_bracket_extra_selections()
 			return
@@ -400,23 +1529,19 @@ class CustomTextEdit(QPlainTextEdit):
 		if pos < length:
 			check_positions.append(pos)
 
-		bracket_pairs = {'(': ')', '[': ']', '{': '}', ')': '(', ']': '[', '}': '{'}
-		opening = '([{'
-		closing = ')]}'
-
 		found = False
 		for p in check_positions:
 			if p < 0 or p >= length:
 				continue
-			c = txt[p]
-			if c in bracket_pairs:
+			c = doc.characterAt(p)
+			if c in _BRACKET_PAIRS:
 				found = True
-				if c in opening:
-					match_pos = self._find_matching_forward(txt, p, c, bracket_pairs[c])
+				if c in _OPENING_BRACKETS:
+					match_pos = self._find_matching_forward(p, c, _BRACKET_PAIRS[c])
 					matched = match_pos is not None
 					self.match_info = {'pos1': p, 'pos2': match_pos, 'matched': matched, 'open_pos': p, 'close_pos': match_pos}
 				else:
-					match_pos = self._find_matching_backward(txt, p, bracket_pairs[c], c)
+					match_pos = self._find_matching_backward(p, _BRACKET_PAIRS[c], c)
 					matched = match_pos is not None
 					self.match_info = {'pos1': match_pos, 'pos2': p, 'matched': matched, 'open_pos': match_pos, 'close_pos': p}
 				break
@@ -426,28 +1551,85 @@ class CustomTextEdit(QPlainTextEdit):
 
 		self._apply_bracket_extra_selections()
 
-	def _find_matching_forward(self, text, start_pos, open_ch, close_ch):
+	def _bracket_chunk_depth(self, chunk, open_ch):
+		summary = self._bracket_chunks.get(chunk)
+		if summary is None:
+			summary = {}
+			block = self.document().findBlockByNumber(chunk * _BRACKET_CHUNK_BLOCKS)
+			for _ in range(_BRACKET_CHUNK_BLOCKS):
+				if not block.isValid():
+					break
+				for ch, depth in block_bracket_data(block).depth.items():
+					prev = summary.get(ch)
+					summary[ch] = depth if prev is None else _combine_bracket_depth(prev, depth)
+				block = block.next()
+			self._bracket_chunks[chunk] = summary
+		return summary.get(open_ch, (0, 0, 0))
+
+	def _find_matching_forward(self, start_pos, open_ch, close_ch):
+		doc = self.document()
+		block = doc.findBlock(start_pos)
+		offset = start_pos - block.position()
 		depth = 0
-		for i in range(start_pos, len(text)):
-			ch = text[i]
-			if ch == open_ch:
-				depth += 1
-			elif ch == close_ch:
-				depth -= 1
-				if depth == 0:
-					return i
+		while block.isValid():
+			number = block.blockNumber()
+			if offset is None and number % _BRACKET_CHUNK_BLOCKS == 0:
+				net, min_prefix, _ = self._bracket_chunk_depth(number // _BRACKET_CHUNK_BLOCKS, open_ch)
+				if depth + min_prefix > 0:
+					depth += net
+					block = doc.findBlockByNumber(number + _BRACKET_CHUNK_BLOCKS)
+					continue
+			data = block_bracket_data(block)
+			summary = data.depth.get(open_ch)
+			if summary is not None:
+				net, min_prefix, _ = summary
+				if offset is not None or depth + min_prefix <= 0:
+					for at, ch in data.brackets:
+						if offset is not None and at < offset:
+							continue
+						if ch == open_ch:
+							depth += 1
+						elif ch == close_ch:
+							depth -= 1
+							if depth == 0:
+								return block.position() + at
+				else:
+					depth += net
+			offset = None
+			block = block.next()
 		return None
 
-	def _find_matching_backward(self, text, start_pos, open_ch, close_ch):
+	def _find_matching_backward(self, start_pos, open_ch, close_ch):
+		doc = self.document()
+		block = doc.findBlock(start_pos)
+		offset = start_pos - block.position()
 		depth = 0
-		for i in range(start_pos, -1, -1):
-			ch = text[i]
-			if ch == close_ch:
-				depth += 1
-			elif ch == open_ch:
-				depth -= 1
-				if depth == 0:
-					return i
+		while block.isValid():
+			number = block.blockNumber()
+			if offset is None and number % _BRACKET_CHUNK_BLOCKS == _BRACKET_CHUNK_BLOCKS - 1:
+				net, _, min_suffix = self._bracket_chunk_depth(number // _BRACKET_CHUNK_BLOCKS, open_ch)
+				if depth + min_suffix > 0:
+					depth -= net
+					block = doc.findBlockByNumber(number - _BRACKET_CHUNK_BLOCKS)
+					continue
+			data = block_bracket_data(block)
+			summary = data.depth.get(open_ch)
+			if summary is not None:
+				net, _, min_suffix = summary
+				if offset is not None or depth + min_suffix <= 0:
+					for at, ch in reversed(data.brackets):
+						if offset is not None and at > offset:
+							continue
+						if ch == close_ch:
+							depth += 1
+						elif ch == open_ch:
+							depth -= 1
+							if depth == 0:
+								return block.position() + at
+				else:
+					depth -= net
+			offset = None
+			block = block.previous()
 		return None
 
 	def _apply_bracket_extra_selections(self):
@@ -501,107 +1683,1959 @@ class CustomTextEdit(QPlainTextEdit):
 		except Exception as e:
 			print("Could not apply extra selections:", e)
 
-class TextEditorTab(QWidget):
-	def __init__(self, get_plain_paste_callback, suggestions_enabled=True, instaplace_rules=None):
-		super().__init__()
-		layout = QVBoxLayout(self)
-		self.editor = CustomTextEdit(plain_paste_callback=get_plain_paste_callback, parent_tab=self)
-		self.editor.setFont(QFont("Consolas", 14))
-		self.sentence_per_paragraph = 3
-		self.editor.textChanged.connect(self.update_counters)
-		layout.addWidget(self.editor)
-		self.linter = EnglishLinter(self.editor.document())
-		self.path = None
-		self.suggestions_enabled = suggestions_enabled
-		self.instaplace_rules = instaplace_rules or []
+def changed_block_span(document, position, added, old_count):
+	"""
+	Maps a contentsChange onto per-block arrays that had `old_count` entries:
+	returns (first block, last block, slice of the old entries they replace), or
+	None when the arrays should be rebuilt from scratch.
+	"""
+	first = document.findBlock(position)
+	last = document.findBlock(position + added)
+	if not last.isValid():
+		last = document.lastBlock()
+	if not first.isValid():
+		return None
+	start = first.blockNumber()
+	old_end = last.blockNumber() - (document.blockCount() - old_count)
+	if old_end < start - 1 or old_end >= old_count:
+		return None
+	return first, last, slice(start, old_end + 1)
 
-	def update_counters(self):
-		text = self.editor.toPlainText()
-		word_count = len(text.split())
-		char_count = len(text)
-		sentence_count = text.count('.') + text.count('!') + text.count('?')
-		paragraph_count = max(1, sentence_count // self.sentence_per_paragraph)
-		return word_count, char_count, paragraph_count
 
-def load_supported_filetypes(path=get_user_config_path("filetypes.json")):
-    try:
-        if os.path.exists(path):
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                if isinstance(data, list):
-                    normalized = set()
-                    for item in data:
-                        if not isinstance(item, str):
-                            continue
-                        it = item.strip()
-                        if not it:
-                            continue
-                        if not it.startswith("."):
-                            it = "." + it
-                        normalized.add(it.lower())
-                    if normalized:
-                        return normalized
-                    else:
-                        print("filetypes.json contained no usable entries, using defaults.")
-                else:
-                    print("filetypes.json is not a list, using defaults.")
-    except Exception as e:
-        print("Failed to load supported filetypes:", e)
+class DocumentStats:
+	"""
+	Word/character/sentence counts kept per block and patched from contentsChange,
+	so a keystroke only recounts the blocks it touched.
+	"""
+	def __init__(self, document):
+		self.document = document
+		self.words = array('l')
+		self.chars = array('l')
+		self.sentences = array('l')
+		self.word_total = self.char_total = self.sentence_total = 0
+		self.rebuild()
+		document.contentsChange.connect(self._on_contents_change)
 
-    return {'.txt', '.tlxt', '.py', '.md', '.json', '.csv', '.js', '.html', '.css'}
+	@staticmethod
+	def _count_blocks(block, last_number):
+		words, chars, sentences = array('l'), array('l'), array('l')
+		while block.isValid():
+			text = block.text()
+			words.append(len(text.split()))
+			chars.append(len(text))
+			sentences.append(text.count('.') + text.count('!') + text.count('?'))
+			if block.blockNumber() == last_number:
+				break
+			block = block.next()
+		return words, chars, sentences
+
+	def rebuild(self):
+		doc = self.document
+		self.words, self.chars, self.sentences = self._count_blocks(doc.firstBlock(), doc.blockCount() - 1)
+		self.word_total = sum(self.words)
+		self.char_total = sum(self.chars)
+		self.sentence_total = sum(self.sentences)
+
+	def _on_contents_change(self, position, removed, added):
+		change = changed_block_span(self.document, position, added, len(self.words))
+		if change is None:
+			self.rebuild()
+			return
 
-class DiscordRPCManager:
-	def __init__(self, client_id, app_name="TLINT Editor"):
-		self.client_id = str(client_id)
-		self.app_name = app_name
+		first, last, span = change
+		words, chars, sentences = self._count_blocks(first, last.blockNumber())
+		self.word_total += sum(words) - sum(self.words[span])
+		self.char_total += sum(chars) - sum(self.chars[span])
+		self.sentence_total += sum(sentences) - sum(self.sentences[span])
+		self.words[span] = words
+		self.chars[span] = chars
+		self.sentences[span] = sentences
+
+	def counts(self):
+		"""
+		Returns (words, characters, sentences) for the whole document, counting the
+		line breaks between blocks as characters like len(toPlainText()) does.
+		"""
+		return self.word_total, self.char_total + max(0, len(self.chars) - 1), self.sentence_total
+
+
+_COMPLETION_WORD_RE = re.compile(r"[^\W\d]\w{2,}")
+_COMPLETION_LIMIT = 20
+_WORDS_EAGER_BLOCKS = 256
+_RECENCY_HALF_LIFE = 200
+
+
+class WordFrequencyIndex:
+	"""
+	Word counts over every open document, with a sorted (lowercased, word) list
+	for prefix lookups and the edit tick at which each word's count last grew,
+	so completions are ranked without reading any document text.
+	"""
+	def __init__(self):
+		self.counts = {}
+		self.last_seen = {}
+		self.entries = []
+		self.tick = 0
+
+	def update(self, delta, recent=True):
+		"""
+		Applies a Counter of per-word count changes; words that reach zero are
+		dropped. With `recent`, words whose count grew are stamped with a new
+		tick; background indexing passes False so it never looks like typing.
+		"""
+		if recent:
+			self.tick += 1
+		counts, last_seen, entries = self.counts, self.last_seen, self.entries
+		new_words = []
+		for word, n in delta.items():
+			if n > 0:
+				if word in counts:
+					counts[word] += n
+				else:
+					counts[word] = n
+					new_words.append(word)
+					last_seen[word] = 0
+				if recent:
+					last_seen[word] = self.tick
+			elif n < 0 and word in counts:
+				left = counts[word] + n
+				if left > 0:
+					counts[word] = left
+					continue
+				del counts[word]
+				del last_seen[word]
+				entry = (word.lower(), word)
+				i = bisect.bisect_left(entries, entry)
+				if i < len(entries) and entries[i] == entry:
+					del entries[i]
+		if len(new_words) > len(entries) // 8:
+			entries.extend((word.lower(), word) for word in new_words)
+			entries.sort()
+		else:
+			for word in new_words:
+				bisect.insort(entries, (word.lower(), word))
+
+	def complete(self, prefix, extra=(), limit=_COMPLETION_LIMIT):
+		"""
+		Up to `limit` completions of `prefix` from the open documents and the rule
+		words in `extra`, best first: a word scores its count, up to doubled when
+		it was typed recently (tick 0 means only ever loaded). Ties keep buffer words first, then `extra` order.
+		The prefix itself is never suggested.
+		"""
+		key = prefix.lower()
+		entries = self.entries
+		candidates = {}
+		i = bisect.bisect_left(entries, (key,))
+		while i < len(entries) and entries[i][0].startswith(key):
+			candidates[entries[i][1]] = None
+			i += 1
+		for word in extra:
+			candidates.setdefault(word)
+		candidates.pop(prefix, None)
+
+		counts, last_seen, tick = self.counts, self.last_seen, self.tick
+
+		def score(word):
+			count = counts.get(word)
+			if not count:
+				return 0.0
+			seen = last_seen[word]
+			if not seen:
+				return float(count)
+			return count * (1 + 0.5 ** ((tick - seen) / _RECENCY_HALF_LIFE))
+
+		return heapq.nlargest(limit, candidates, key=score)
+
+
+BUFFER_WORDS = WordFrequencyIndex()
+
+
+class DocumentWords:
+	"""
+	Feeds one document's words into a WordFrequencyIndex. The words of each
+	block are kept (interned) so an edit only recounts the blocks it touched,
+	the same way DocumentStats patches its counts. A change spanning more than
+	_WORDS_EAGER_BLOCKS blocks (opening a file, a big paste) leaves them as
+	None and indexes them in idle time slices instead.
+	"""
+	def __init__(self, document, index=BUFFER_WORDS):
+		self.document = document
+		self.index = index
+		self.blocks = []
+		self.sweep = 0
+		self.timer = QTimer(document)
+		self.timer.setInterval(0)
+		self.timer.timeout.connect(self._index_slice)
+		self.rebuild()
+		document.contentsChange.connect(self._on_contents_change)
+
+	@staticmethod
+	def _block_words(block, last_number, deadline=None):
+		findall = _COMPLETION_WORD_RE.findall
+		intern = sys.intern
+		blocks = []
+		while block.isValid():
+			blocks.append(tuple(map(intern, findall(block.text()))))
+			if block.blockNumber() == last_number:
+				break
+			if deadline is not None and time.perf_counter() >= deadline:
+				break
+			block = block.next()
+		return blocks
+
+	def _words_for(self, block, last_number):
+		count = last_number - block.blockNumber() + 1
+		if count > _WORDS_EAGER_BLOCKS:
+			self.timer.start()
+			return [None] * count
+		return self._block_words(block, last_number)
+
+	@staticmethod
+	def _count(delta, blocks, sign):
+		for words in blocks:
+			if words:
+				if sign > 0:
+					delta.update(words)
+				else:
+					delta.subtract(words)
+
+	def rebuild(self):
+		doc = self.document
+		delta = Counter()
+		self._count(delta, self.blocks, -1)
+		self.blocks = self._words_for(doc.firstBlock(), doc.blockCount() - 1)
+		self._count(delta, self.blocks, 1)
+		self.index.update(delta, recent=False)
+
+	def _on_contents_change(self, position, removed, added):
+		change = changed_block_span(self.document, position, added, len(self.blocks))
+		if change is None:
+			self.rebuild()
+			return
+
+		first, last, span = change
+		blocks = self._words_for(first, last.blockNumber())
+		delta = Counter()
+		self._count(delta, blocks, 1)
+		self._count(delta, self.blocks[span], -1)
+		self.blocks[span] = blocks
+		if delta:
+			self.index.update(delta)
+
+	def _index_slice(self):
+		blocks = self.blocks
+		try:
+			start = blocks.index(None, self.sweep)
+		except ValueError:
+			# Edits above the sweep may have shifted pending blocks behind it.
+			try:
+				start = blocks.index(None)
+			except ValueError:
+				self.timer.stop()
+				return
+		end = start
+		while end < len(blocks) and blocks[end] is None:
+			end += 1
+		deadline = time.perf_counter() + _HIGHLIGHT_SLICE_SECONDS
+		words = self._block_words(self.document.findBlockByNumber(start), end - 1, deadline)
+		blocks[start:start + len(words)] = words
+		self.sweep = start + len(words)
+		delta = Counter()
+		self._count(delta, words, 1)
+		self.index.update(delta, recent=False)
+
+	@property
+	def active(self):
+		return self.timer.isActive()
+
+	def release(self):
+		"""
+		Takes this document's words back out of the index when its tab closes.
+		"""
+		self.timer.stop()
+		delta = Counter()
+		self._count(delta, self.blocks, -1)
+		self.blocks = []
+		self.index.update(delta, recent=False)
+		self.document.contentsChange.disconnect(self._on_contents_change)
+
+
+AUTOSAVE_DIR = os.path.join(USER_CONFIG_DIR, "autosave")
+_AUTOSAVE_INTERVAL_MS = 2000
+_AUTOSAVE_STALE_SECONDS = 30
+_JOURNAL_COMPACT_BYTES = 1024 * 1024
+_JOURNAL_SNAPSHOT_CHARS = 64 * 1024
+_JOURNAL_IDLE_SECONDS = 1.0
+_JOURNAL_MAX_DEFER_SECONDS = 10.0
+_journal_writer = None
+
+
+def get_journal_writer():
+	"""
+	Single background thread for all journal file I/O, so writes stay in order
+	and never block typing.
+	"""
+	global _journal_writer
+	if _journal_writer is None:
+		_journal_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="journal")
+		atexit.register(_journal_writer.shutdown, wait=True)
+	return _journal_writer
+
+
+def _replace_file_text(path, text):
+	tmp_path = path + ".tmp"
+	with open(tmp_path, "w", encoding="utf-8", errors="surrogatepass", newline="") as f:
+		f.write(text)
+		f.flush()
+		os.fsync(f.fileno())
+	os.replace(tmp_path, path)
+
+
+def _write_journal_generation(snapshot_path, snapshot_text, journal_path, meta_path, meta_text, stale_paths):
+	if snapshot_text is not None:
+		_replace_file_text(snapshot_path, snapshot_text)
+	open(journal_path, "w").close()
+	_replace_file_text(meta_path, meta_text)
+	_remove_files(stale_paths)
+
+
+def _append_journal(journal_path, data):
+	with open(journal_path, "a", encoding="utf-8", newline="") as f:
+		f.write(data)
+
+
+def _remove_files(paths):
+	for path in paths:
+		try:
+			os.remove(path)
+		except OSError:
+			pass
+
+
+def _report_journal_error(future):
+	if future.exception() is not None:
+		print("Autosave failed:", future.exception())
+
+
+class EditJournal:
+	"""
+	Crash-recovery journal for one document. Each contentsChange is kept as
+	{"p": position, "r": chars removed, "t": text inserted} and appended to the
+	journal file on flush(). The journal replays on top of a base: the file the
+	tab was opened from or saved to (valid while its mtime and size match), or a
+	snapshot written by compact() once the journal outgrows the document or a
+	single change is too large to be worth journaling. Each base/journal pair is
+	a generation and <id>.json names the current one, so replacing it switches
+	both atomically.
+	"""
+	def __init__(self, session_dir, document, title, path=None, skip=0):
+		self.session_dir = session_dir
+		self.document = document
+		self.title = title
+		self.path = path
+		self.id = uuid.uuid4().hex
+		self.meta_path = os.path.join(session_dir, self.id + ".json")
+		self.generation = 0
+		self.base = None
+		self.base_size = 0
+		self.journal_bytes = 0
+		self.pending = []
+		self.changes = 0
+		self.snapshot_due = False
+		self.last_change = 0.0
+		self.compact_due_since = None
+		self.written = False
+		self.revision = document.revision()
+		if path:
+			self._set_file_base(path, skip)
+		else:
+			self.base = {"snapshot": True}
+		document.contentsChange.connect(self._on_contents_change)
+
+	def _file(self, generation, ext):
+		return os.path.join(self.session_dir, f"{self.id}.{generation}.{ext}")
+
+	def _submit(self, fn, *args):
+		get_journal_writer().submit(fn, *args).add_done_callback(_report_journal_error)
+
+	def _set_file_base(self, path, skip):
+		st = os.stat(path)
+		self.base = {"file": path, "mtime_ns": st.st_mtime_ns, "size": st.st_size, "skip": skip}
+		self.base_size = st.st_size
+
+	def _on_contents_change(self, position, removed, added):
+		if not removed and not added:
+			return
+		# Formatting changes (markContentsDirty, highlighters) arrive as
+		# removed == added without a new document revision; the text is unchanged.
+		revision = self.document.revision()
+		if removed == added and revision == self.revision:
+			return
+		self.revision = revision
+		self.changes += 1
+		self.last_change = time.monotonic()
+		if self.snapshot_due:
+			return
+		if added > _JOURNAL_SNAPSHOT_CHARS:
+			self.pending = []
+			self.snapshot_due = True
+			self.compact_due_since = self.last_change
+			return
+		doc = self.document
+		end = min(position + added, doc.characterCount() - 1)
+		text = ""
+		if end > position:
+			cursor = QTextCursor(doc)
+			cursor.setPosition(position)
+			cursor.setPosition(end, QTextCursor.KeepAnchor)
+			text = cursor.selectedText().replace("\u2029", "\n")
+		self.pending.append({"p": position, "r": removed, "t": text})
+
+	def _start_generation(self, snapshot_text=None):
+		"""
+		Queues a fresh generation (optional snapshot plus empty journal), points
+		the meta file at it and removes the previous generation's files.
+		"""
+		stale = [self._file(self.generation, "snapshot"), self._file(self.generation, "journal")] if self.written else []
+		self.generation += 1
+		meta = {"title": self.title, "path": self.path, "generation": self.generation, "base": self.base}
+		self._submit(
+			_write_journal_generation,
+			self._file(self.generation, "snapshot"), snapshot_text,
+			self._file(self.generation, "journal"), self.meta_path, json.dumps(meta), stale
+		)
+		self.written = True
+		self.journal_bytes = 0
+
+	def _compact_allowed(self):
+		"""
+		Snapshots copy the whole document on the GUI thread, so they wait for a
+		pause in typing unless they have already been put off for too long.
+		"""
+		now = time.monotonic()
+		if self.compact_due_since is None:
+			self.compact_due_since = now
+		return now - self.last_change >= _JOURNAL_IDLE_SECONDS or now - self.compact_due_since >= _JOURNAL_MAX_DEFER_SECONDS
+
+	def flush(self):
+		if self.snapshot_due:
+			if self._compact_allowed():
+				self.compact()
+			return
+		if not self.pending:
+			return
+		if not self.written:
+			# Nothing is on disk until the first edit; the base is still intact.
+			self._start_generation("" if "snapshot" in self.base else None)
+		data = "".join(json.dumps(entry) + "\n" for entry in self.pending)
+		self.pending = []
+		self._submit(_append_journal, self._file(self.generation, "journal"), data)
+		self.journal_bytes += len(data)
+		if self.journal_bytes > max(_JOURNAL_COMPACT_BYTES, self.base_size) and self._compact_allowed():
+			self.compact()
+
+	def compact(self):
+		text = self.document.toPlainText()
+		self.pending = []
+		self.snapshot_due = False
+		self.compact_due_since = None
+		self.base = {"snapshot": True}
+		self.base_size = len(text)
+		self._start_generation(text)
+
+	def rebase(self, path, skip=0, changes=None):
+		"""
+		The document was just written to `path`: that file becomes the base and
+		the journal starts over empty. `changes` is the change count when the
+		written text was taken; if the document has moved on since, the file no
+		longer matches it and the journal is compacted into a snapshot instead.
+		"""
+		self.path = path
+		self.title = os.path.basename(path)
+		if changes is not None and changes != self.changes:
+			self.compact()
+			return
+		self.pending = []
+		self.snapshot_due = False
+		self.compact_due_since = None
+		self._set_file_base(path, skip)
+		if self.written:
+			self._start_generation()
+
+	def discard(self):
+		try:
+			self.document.contentsChange.disconnect(self._on_contents_change)
+		except TypeError:
+			pass
+		self.pending = []
+		self.snapshot_due = False
+		self.compact_due_since = None
+		if self.written:
+			self._submit(_remove_files, [self.meta_path, self._file(self.generation, "snapshot"), self._file(self.generation, "journal")])
+			self.written = False
+
+
+def find_orphaned_journals(own_session_dir):
+	"""
+	Meta files left by sessions whose heartbeat has gone stale, i.e. crashed.
+	"""
+	orphans = []
+	try:
+		sessions = os.listdir(AUTOSAVE_DIR)
+	except OSError:
+		return orphans
+	for name in sessions:
+		session_dir = os.path.join(AUTOSAVE_DIR, name)
+		if os.path.abspath(session_dir) == os.path.abspath(own_session_dir) or not os.path.isdir(session_dir):
+			continue
+		try:
+			age = time.time() - os.stat(os.path.join(session_dir, "heartbeat")).st_mtime
+		except OSError:
+			age = _AUTOSAVE_STALE_SECONDS
+		if age < _AUTOSAVE_STALE_SECONDS:
+			continue
+		orphans.extend(os.path.join(session_dir, f) for f in sorted(os.listdir(session_dir)) if f.endswith(".json"))
+	return orphans
+
+
+def replay_journal(meta_path):
+	"""
+	Rebuilds a journaled document and returns (meta, text). Raises ValueError if
+	the base file changed since it was recorded. A torn final journal line from
+	the crash ends the replay.
+	"""
+	with open(meta_path, "r", encoding="utf-8") as f:
+		meta = json.load(f)
+	prefix = os.path.join(os.path.dirname(meta_path), os.path.basename(meta_path)[:-len(".json")] + f".{meta['generation']}.")
+	base = meta["base"]
+	if "file" in base:
+		st = os.stat(base["file"])
+		if st.st_mtime_ns != base["mtime_ns"] or st.st_size != base["size"]:
+			raise ValueError(f"{base['file']} was modified after the crash")
+		with open(base["file"], "r", encoding="utf-8") as f:
+			text = f.read()[base.get("skip", 0):]
+	else:
+		with open(prefix + "snapshot", "r", encoding="utf-8", errors="surrogatepass", newline="") as f:
+			text = f.read()
+
+	doc = QTextDocument()
+	doc.setUndoRedoEnabled(False)
+	doc.setPlainText(text)
+	cursor = QTextCursor(doc)
+	with open(prefix + "journal", "r", encoding="utf-8", newline="") as f:
+		for line in f:
+			try:
+				entry = json.loads(line)
+			except ValueError:
+				break
+			limit = doc.characterCount() - 1
+			position = min(entry["p"], limit)
+			cursor.setPosition(position)
+			cursor.setPosition(min(position + entry["r"], limit), QTextCursor.KeepAnchor)
+			cursor.insertText(entry["t"])
+	return meta, doc.toPlainText()
+
+
+_SAVE_CHUNK_CHARS = 1024 * 1024
+_save_pool = None
+_umask = os.umask(0)
+os.umask(_umask)
+
+
+def get_save_pool():
+	global _save_pool
+	if _save_pool is None:
+		_save_pool = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 2), thread_name_prefix="save")
+		atexit.register(_save_pool.shutdown, wait=True)
+	return _save_pool
+
+
+def write_text_atomic(path, text):
+	"""
+	Encodes `text` in chunks into a temporary file beside `path`, fsyncs it and
+	renames it over `path`, so a crash leaves either the old file or the new
+	one. The existing file's permissions are kept. Returns the bytes written.
+	"""
+	directory = os.path.dirname(os.path.abspath(path))
+	try:
+		mode = stat.S_IMODE(os.stat(path).st_mode)
+	except FileNotFoundError:
+		mode = 0o666 & ~_umask
+	fd, tmp_path = tempfile.mkstemp(prefix="." + os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+	written = 0
+	try:
+		with os.fdopen(fd, "wb") as f:
+			for start in range(0, len(text), _SAVE_CHUNK_CHARS):
+				chunk = text[start:start + _SAVE_CHUNK_CHARS]
+				if os.linesep != "\n":
+					chunk = chunk.replace("\n", os.linesep)
+				written += f.write(chunk.encode("utf-8"))
+			f.flush()
+			os.fsync(f.fileno())
+		os.chmod(tmp_path, mode)
+		os.replace(tmp_path, path)
+	except BaseException:
+		try:
+			os.remove(tmp_path)
+		except OSError:
+			pass
+		raise
+	if hasattr(os, "O_DIRECTORY"):
+		dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+		try:
+			os.fsync(dir_fd)
+		finally:
+			os.close(dir_fd)
+	return written
+
+
+class TextEditorTab(QWidget):
+	def __init__(self, get_plain_paste_callback, suggestions_enabled=True, instaplace_rules=None, instaplace_index=None):
+		super().__init__()
+		layout = QVBoxLayout(self)
+		self.editor = CustomTextEdit(plain_paste_callback=get_plain_paste_callback, parent_tab=self)
+		self.editor.setFont(QFont("Consolas", 14))
+		self.sentence_per_paragraph = 3
+		self.stats = DocumentStats(self.editor.document())
+		self.buffer_words = DocumentWords(self.editor.document())
+		self.editor.textChanged.connect(self.update_counters)
+		layout.addWidget(self.editor)
+		self.linter = EnglishLinter(self.editor.document())
+		self.highlighter = DeferredHighlighter(self.linter, self.editor)
+		self.path = None
+		self.save_future = None
+		self.queued_save = None
+		self.suggestions_enabled = suggestions_enabled
+		self.instaplace_rules = instaplace_rules or []
+		self.instaplace_index = instaplace_index
+
+	def load_text(self, text):
+		"""
+		Replaces the document text without highlighting all of it up front.
+		"""
+		self.highlighter.load(text)
+
+	@LATENCY.timed("counters.tab")
+	def update_counters(self):
+		word_count, char_count, sentence_count = self.stats.counts()
+		paragraph_count = max(1, sentence_count // self.sentence_per_paragraph) if self.sentence_per_paragraph > 0 else 1
+		return word_count, char_count, paragraph_count
+
+LARGE_FILE_THRESHOLD = 50 * 1024 * 1024
+_LINE_INDEX_CHUNK = 8 * 1024 * 1024
+_LARGE_LINE_DISPLAY = 4096
+
+
+class LineIndexer(QThread):
+	"""
+	Builds the line-start offset table of a memory-mapped file off the GUI thread.
+	"""
+	progress = pyqtSignal(int)
+
+	def __init__(self, mapped, offsets, parent=None):
+		super().__init__(parent)
+		self.mapped = mapped
+		self.offsets = offsets
+		self._stopped = False
+
+	def stop(self):
+		self._stopped = True
+		self.wait()
+
+	def run(self):
+		size = len(self.mapped)
+		pos = 0
+		while pos < size and not self._stopped:
+			chunk = self.mapped[pos:pos + _LINE_INDEX_CHUNK]
+			parts = chunk.split(b"\n")
+			starts = itertools.accumulate(map((1).__add__, map(len, parts[:-1])), initial=pos)
+			next(starts)
+			self.offsets.extend(starts)
+			pos += len(chunk)
+			self.progress.emit(len(self.offsets))
+
+
+class LargeFileView(QAbstractScrollArea):
+	"""
+	Read-only, virtualized view over a LargeFileTab: only the lines inside the
+	viewport are decoded and painted.
+	"""
+	def __init__(self, source, parent=None):
+		super().__init__(parent)
+		self.setObjectName("large_file_view")
+		self.source = source
+		self.match = None
+		self._content_width = 0
+		self.setFont(QFont("Consolas", 14))
+		self.verticalScrollBar().setSingleStep(1)
+
+	def visible_lines(self):
+		return max(1, self.viewport().height() // self.fontMetrics().lineSpacing())
+
+	def update_scrollbars(self):
+		visible = self.visible_lines()
+		vbar = self.verticalScrollBar()
+		vbar.setRange(0, max(0, self.source.line_count() - visible))
+		vbar.setPageStep(visible)
+		hbar = self.horizontalScrollBar()
+		hbar.setRange(0, max(0, self._content_width - self.viewport().width()))
+		hbar.setPageStep(self.viewport().width())
+
+	def scroll_to_line(self, line):
+		self.update_scrollbars()
+		self.verticalScrollBar().setValue(max(0, line - self.visible_lines() // 2))
+		self.viewport().update()
+
+	def show_match(self, offset, length):
+		self.match = (offset, length)
+		self.scroll_to_line(self.source.line_of(offset))
+
+	def scrollContentsBy(self, dx, dy):
+		self.viewport().update()
+
+	def resizeEvent(self, event):
+		super().resizeEvent(event)
+		self.update_scrollbars()
+
+	def paintEvent(self, event):
+		painter = QPainter(self.viewport())
+		painter.setFont(self.font())
+		fm = self.fontMetrics()
+		line_height = fm.lineSpacing()
+		x = 4 - self.horizontalScrollBar().value()
+		first = self.verticalScrollBar().value()
+		last = min(first + self.visible_lines() + 1, self.source.line_count())
+		widest = self._content_width
+		text_color = self.palette().color(QPalette.Text)
+		for row, line in enumerate(range(first, last)):
+			y = row * line_height
+			start, end = self.source.line_span(line)
+			text = self.source.decode(start, end)
+			if self.match and start <= self.match[0] < end:
+				offset, length = self.match
+				before = self.source.decode(start, offset)
+				found = self.source.decode(offset, min(end, offset + length))
+				left = fm.horizontalAdvance(before)
+				painter.fillRect(x + left, y, fm.horizontalAdvance(found), line_height, QColor(60, 120, 180, 140))
+			painter.setPen(text_color)
+			painter.drawText(x, y + fm.ascent(), text)
+			widest = max(widest, fm.horizontalAdvance(text) + 8)
+		painter.end()
+		if widest != self._content_width:
+			self._content_width = widest
+			self.update_scrollbars()
+
+
+class LargeFileTab(QWidget):
+	"""
+	Tab for files above LARGE_FILE_THRESHOLD: the file is memory-mapped, its line
+	index is built in the background and searches run directly against the map.
+	"""
+	def __init__(self, path):
+		super().__init__()
+		self.path = path
+		self._file = open(path, "rb")
+		self.mapped = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+		self.offsets = array('Q', [0])
+		self.indexing = True
+		self.last_hit = None
+		self._pending_match = None
+
+		layout = QVBoxLayout(self)
+		self.info_label = QLabel()
+		self.info_label.setStyleSheet("color: gray;")
+		layout.addWidget(self.info_label)
+		self.view = LargeFileView(self)
+		layout.addWidget(self.view)
+
+		self.indexer = LineIndexer(self.mapped, self.offsets, self)
+		self.indexer.progress.connect(self._on_index_progress)
+		self.indexer.finished.connect(self._on_index_finished)
+		self._update_info()
+		self.indexer.start()
+
+	def line_count(self):
+		count = len(self.offsets)
+		if not self.indexing and count > 1 and self.offsets[-1] == len(self.mapped):
+			count -= 1
+		return count
+
+	def line_span(self, line):
+		start = self.offsets[line]
+		end = self.offsets[line + 1] - 1 if line + 1 < len(self.offsets) else len(self.mapped)
+		if self.indexing and line + 1 >= len(self.offsets):
+			end = min(end, start + _LARGE_LINE_DISPLAY)
+		return start, end
+
+	def line_of(self, offset):
+		return max(0, bisect.bisect_right(self.offsets, offset) - 1)
+
+	def decode(self, start, end):
+		end = min(end, start + _LARGE_LINE_DISPLAY)
+		text = self.mapped[start:end].decode("utf-8", errors="replace")
+		return text.rstrip("\r").expandtabs(4)
+
+	def find_next(self, text, case_sensitive=False):
+		needle = text.encode("utf-8")
+		if not needle:
+			return False
+		start = self.last_hit + 1 if self.last_hit is not None else 0
+		hit = self._search(needle, start, case_sensitive)
+		if hit < 0 and start > 0:
+			hit = self._search(needle, 0, case_sensitive)
+		if hit < 0:
+			return False
+		self.last_hit = hit
+		if self.indexing and hit >= self.offsets[-1]:
+			self._pending_match = (hit, len(needle))
+		else:
+			self.view.show_match(hit, len(needle))
+		return True
+
+	def _search(self, needle, start, case_sensitive):
+		if case_sensitive:
+			return self.mapped.find(needle, start)
+		needle = needle.lower()
+		size = len(self.mapped)
+		pos = start
+		while pos < size:
+			chunk = self.mapped[pos:pos + _LINE_INDEX_CHUNK + len(needle) - 1].lower()
+			found = chunk.find(needle)
+			if found >= 0:
+				return pos + found
+			pos += _LINE_INDEX_CHUNK
+		return -1
+
+	def _update_info(self):
+		state = "indexing..." if self.indexing else "read-only"
+		self.info_label.setText(f"Large file mode ({state}): {self.line_count():,} lines, {len(self.mapped):,} bytes")
+
+	def _on_index_progress(self, _):
+		if self.mapped.closed:
+			# A queued progress/finished signal can land after close_file().
+			return
+		self._update_info()
+		self.view.update_scrollbars()
+		if self._pending_match and self._pending_match[0] < self.offsets[-1]:
+			match, self._pending_match = self._pending_match, None
+			self.view.show_match(*match)
+		self.view.viewport().update()
+
+	def _on_index_finished(self):
+		self.indexing = False
+		self._on_index_progress(len(self.offsets))
+
+	def close_file(self):
+		try:
+			self.indexer.stop()
+			self.mapped.close()
+			self._file.close()
+		except Exception as e:
+			print("Large file close error:", e)
+
+
+def load_supported_filetypes(path=get_user_config_path("filetypes.json")):
+    try:
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+                if isinstance(data, list):
+                    normalized = set()
+                    for item in data:
+                        if not isinstance(item, str):
+                            continue
+                        it = item.strip()
+                        if not it:
+                            continue
+                        if not it.startswith("."):
+                            it = "." + it
+                        normalized.add(it.lower())
+                    if normalized:
+                        return normalized
+                    else:
+                        print("filetypes.json contained no usable entries, using defaults.")
+                else:
+                    print("filetypes.json is not a list, using defaults.")
+    except Exception as e:
+        print("Failed to load supported filetypes:", e)
+
+    return {'.txt', '.tlxt', '.py', '.md', '.json', '.csv', '.js', '.html', '.css'}
+
+DEFAULT_IGNORE_PATTERNS = [
+	".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv", ".tox", ".mypy_cache",
+	".pytest_cache", ".ruff_cache", "dist", "build", "target", ".idea", ".vscode"
+]
+
+
+def load_ignore_patterns(path=get_user_config_path("ignore.json")):
+	try:
+		if os.path.exists(path):
+			with open(path, "r", encoding="utf-8") as f:
+				data = json.load(f)
+				if isinstance(data, list):
+					return [item.strip() for item in data if isinstance(item, str) and item.strip()]
+				print("ignore.json is not a list, using defaults.")
+	except Exception as e:
+		print("Failed to load ignore patterns:", e)
+	return list(DEFAULT_IGNORE_PATTERNS)
+
+
+def _path_glob_regex(pattern):
+	"""
+	Compiles a root-relative gitignore glob: * and ? stay within one path
+	segment, **/ matches any number of directories and a trailing /** matches
+	everything inside.
+	"""
+	parts = []
+	i, n = 0, len(pattern)
+	while i < n:
+		ch = pattern[i]
+		if pattern.startswith("**/", i) and (i == 0 or pattern[i - 1] == "/"):
+			parts.append("(?:.*/)?")
+			i += 3
+			continue
+		if pattern.startswith("/**", i) and i + 3 == n:
+			parts.append("/.*")
+			break
+		if ch == "*":
+			parts.append("[^/]*")
+		elif ch == "?":
+			parts.append("[^/]")
+		elif ch == "[":
+			j = i + 1
+			if j < n and pattern[j] == "!":
+				j += 1
+			if j < n and pattern[j] == "]":
+				j += 1
+			j = pattern.find("]", j)
+			if j < 0:
+				parts.append(re.escape(ch))
+			else:
+				body = pattern[i + 1:j].replace("\\", "\\\\")
+				if body.startswith("!"):
+					body = "^" + body[1:]
+				parts.append("[" + body + "]")
+				i = j
+		else:
+			parts.append(re.escape(ch))
+		i += 1
+	return re.compile("".join(parts))
+
+
+class IgnoreRules:
+	"""
+	Name/path globs from ignore.json plus the project root's .gitignore, with
+	gitignore semantics: a pattern containing a slash (other than a trailing
+	one) is anchored to the project root, anything else matches an entry name
+	at any depth. Negated (!) gitignore entries are not supported and are
+	skipped.
+	"""
+	def __init__(self, root, patterns):
+		self.root = root
+		self.name_patterns = []
+		self.path_patterns = []
+		for pattern in list(patterns) + self._read_gitignore(root):
+			dir_only = pattern.endswith("/")
+			pattern = pattern.rstrip("/")
+			anchored = "/" in pattern
+			pattern = pattern.lstrip("/")
+			if not pattern:
+				continue
+			if anchored:
+				self.path_patterns.append((pattern, dir_only))
+			else:
+				self.name_patterns.append((pattern, dir_only))
+		self._path_regexes = [(_path_glob_regex(pattern), dir_only) for pattern, dir_only in self.path_patterns]
+
+	@staticmethod
+	def _read_gitignore(root):
+		patterns = []
+		try:
+			with open(os.path.join(root, ".gitignore"), "r", encoding="utf-8") as f:
+				for line in f:
+					line = line.strip()
+					if line and not line.startswith("#") and not line.startswith("!"):
+						patterns.append(line)
+		except OSError:
+			pass
+		return patterns
+
+	def ignored(self, path, name, is_dir):
+		for pattern, dir_only in self.name_patterns:
+			if (is_dir or not dir_only) and fnmatch.fnmatch(name, pattern):
+				return True
+		if self._path_regexes:
+			rel = os.path.relpath(path, self.root).replace(os.sep, "/")
+			for regex, dir_only in self._path_regexes:
+				if (is_dir or not dir_only) and regex.fullmatch(rel):
+					return True
+		return False
+
+
+def scan_project_directory(path, rules, filetypes):
+	"""
+	Returns the (subdirectories, files) of one directory as sorted name lists,
+	skipping hidden entries, ignored paths and unsupported file types.
+	"""
+	dirs, files = [], []
+	try:
+		with os.scandir(path) as entries:
+			for entry in entries:
+				name = entry.name
+				if name.startswith("."):
+					continue
+				try:
+					is_dir = entry.is_dir(follow_symlinks=False)
+				except OSError:
+					continue
+				if rules.ignored(entry.path, name, is_dir):
+					continue
+				if is_dir:
+					dirs.append(name)
+				elif os.path.splitext(name)[1].lower() in filetypes:
+					files.append(name)
+	except OSError:
+		pass
+	dirs.sort(key=str.lower)
+	files.sort(key=str.lower)
+	return dirs, files
+
+
+def walk_project_files(root, rules, filetypes, should_stop=None):
+	pending = [root]
+	while pending:
+		if should_stop and should_stop():
+			return
+		path = pending.pop()
+		dirs, files = scan_project_directory(path, rules, filetypes)
+		for name in files:
+			yield os.path.join(path, name)
+		pending.extend(os.path.join(path, name) for name in reversed(dirs))
+
+
+class ProjectIndexer(QThread):
+	"""
+	Walks the project tree breadth-first off the GUI thread and reports every
+	directory's filtered listing as it is scanned.
+	"""
+	directory_scanned = pyqtSignal(str, list, list)
+
+	def __init__(self, root, rules, filetypes, parent=None):
+		super().__init__(parent)
+		self.root = root
+		self.rules = rules
+		self.filetypes = filetypes
+		self._stopped = False
+
+	def stop(self):
+		self._stopped = True
+		self.wait()
+
+	def run(self):
+		pending = [self.root]
+		while pending and not self._stopped:
+			path = pending.pop(0)
+			dirs, files = scan_project_directory(path, self.rules, self.filetypes)
+			self.directory_scanned.emit(path, dirs, files)
+			pending.extend(os.path.join(path, name) for name in dirs)
+
+
+class ProjectFileModel(QStandardItemModel):
+	"""
+	File browser model for a project root. Listings come from a ProjectIndexer,
+	directory rows are only materialized when expanded, and refresh_directory()
+	rescans a single folder instead of resetting the whole tree.
+	"""
+	PATH_ROLE = Qt.UserRole + 1
+	IS_DIR_ROLE = Qt.UserRole + 2
+	POPULATED_ROLE = Qt.UserRole + 3
+
+	def __init__(self, filetypes, ignore_patterns, parent=None):
+		super().__init__(parent)
+		self.setHorizontalHeaderLabels(["Name"])
+		self.filetypes = filetypes
+		self.ignore_patterns = ignore_patterns
+		self.root = None
+		self.rules = None
+		self.listings = {}
+		self.dir_items = {}
+		self.indexer = None
+		icons = QFileIconProvider()
+		self.folder_icon = icons.icon(QFileIconProvider.Folder)
+		self.file_icon = icons.icon(QFileIconProvider.File)
+
+	def rootPath(self):
+		return self.root
+
+	def filePath(self, index):
+		return index.data(self.PATH_ROLE) if index.isValid() else self.root
+
+	def path_index(self, path):
+		item = self.dir_items.get(os.path.abspath(path))
+		return item.index() if item is not None else QModelIndex()
+
+	def set_root(self, root):
+		self.stop()
+		self.root = os.path.abspath(root)
+		self.rules = IgnoreRules(self.root, self.ignore_patterns)
+		self.listings = {}
+		self.dir_items = {}
+		self.removeRows(0, self.rowCount())
+		self.indexer = ProjectIndexer(self.root, self.rules, self.filetypes, self)
+		self.indexer.directory_scanned.connect(self._on_directory_scanned)
+		self.indexer.start()
+
+	def set_filters(self, filetypes=None, ignore_patterns=None):
+		if filetypes is not None:
+			self.filetypes = filetypes
+		if ignore_patterns is not None:
+			self.ignore_patterns = ignore_patterns
+		if self.root:
+			self.set_root(self.root)
+
+	def stop(self):
+		if self.indexer is not None:
+			self.indexer.stop()
+			self.indexer = None
+
+	def indexed_files(self):
+		for path, (_, files) in list(self.listings.items()):
+			for name in files:
+				yield os.path.join(path, name)
+
+	def _make_item(self, parent_path, name, is_dir):
+		path = os.path.join(parent_path, name)
+		item = QStandardItem(self.folder_icon if is_dir else self.file_icon, name)
+		item.setEditable(False)
+		item.setData(path, self.PATH_ROLE)
+		item.setData(is_dir, self.IS_DIR_ROLE)
+		if is_dir:
+			self.dir_items[path] = item
+		return item
+
+	def _parent_item(self, path):
+		return self.invisibleRootItem() if path == self.root else self.dir_items.get(path)
+
+	def _populate(self, path):
+		parent = self._parent_item(path)
+		if parent is None or path not in self.listings:
+			return
+		dirs, files = self.listings[path]
+		existing = {}
+		for row in range(parent.rowCount() - 1, -1, -1):
+			child = parent.child(row)
+			key = (child.text(), child.data(self.IS_DIR_ROLE))
+			wanted = dirs if key[1] else files
+			if key[0] in wanted:
+				existing[key] = child
+			else:
+				self._forget(child)
+				parent.removeRow(row)
+		row = 0
+		for is_dir, names in ((True, dirs), (False, files)):
+			for name in names:
+				if (name, is_dir) not in existing:
+					parent.insertRow(row, self._make_item(path, name, is_dir))
+				row += 1
+		if parent is not self.invisibleRootItem():
+			parent.setData(True, self.POPULATED_ROLE)
+
+	def _forget(self, item):
+		if item.data(self.IS_DIR_ROLE):
+			path = item.data(self.PATH_ROLE)
+			self.dir_items.pop(path, None)
+			prefix = path + os.sep
+			for key in [key for key in self.listings if key == path or key.startswith(prefix)]:
+				del self.listings[key]
+			for row in range(item.rowCount()):
+				self._forget(item.child(row))
+
+	def _is_populated(self, item):
+		return item is self.invisibleRootItem() or bool(item.data(self.POPULATED_ROLE))
+
+	def _on_directory_scanned(self, path, dirs, files):
+		if self.indexer is None or self.sender() is not self.indexer:
+			return
+		self.listings[path] = (dirs, files)
+		parent = self._parent_item(path)
+		if parent is not None and self._is_populated(parent):
+			self._populate(path)
+
+	def refresh_directory(self, path):
+		path = os.path.abspath(path)
+		if self.rules is None:
+			return
+		self.listings[path] = scan_project_directory(path, self.rules, self.filetypes)
+		parent = self._parent_item(path)
+		if parent is not None and self._is_populated(parent):
+			self._populate(path)
+
+	def hasChildren(self, parent=QModelIndex()):
+		if not parent.isValid():
+			return super().hasChildren(parent)
+		item = self.itemFromIndex(parent)
+		if item is None or not item.data(self.IS_DIR_ROLE):
+			return False
+		if not self._is_populated(item):
+			listing = self.listings.get(item.data(self.PATH_ROLE))
+			return listing is None or bool(listing[0] or listing[1])
+		return item.rowCount() > 0
+
+	def canFetchMore(self, parent):
+		if not parent.isValid():
+			return False
+		item = self.itemFromIndex(parent)
+		return item is not None and bool(item.data(self.IS_DIR_ROLE)) and not self._is_populated(item)
+
+	def fetchMore(self, parent):
+		item = self.itemFromIndex(parent)
+		if item is None:
+			return
+		path = item.data(self.PATH_ROLE)
+		if path not in self.listings:
+			self.listings[path] = scan_project_directory(path, self.rules, self.filetypes)
+		self._populate(path)
+
+
+_QUICK_OPEN_RESULTS = 50
+# Each ranking stage scores at most this many matches, after looking at no
+# more than _QUICK_OPEN_SCANNED bitmask candidates (shortest paths first).
+_QUICK_OPEN_SCORED = 300
+_QUICK_OPEN_SCANNED = 4096
+_QUICK_OPEN_BATCH = 1024
+_QUICK_OPEN_TIER = 1 << 20
+_QUICK_OPEN_BOUNDARIES = "/_-. "
+_BIT_FLAGS = bytes.maketrans(b"01", b"\x00\x01")
+_FLAG_RE = re.compile(b"\x01")
+
+
+# Bumped whenever ignore matching changes, so listings filtered the old way are dropped.
+_FILE_INDEX_CACHE_VERSION = 2
+
+
+def file_index_cache_path(root):
+	digest = hashlib.sha1(root.encode("utf-8", errors="surrogateescape")).hexdigest()
+	return os.path.join(USER_CONFIG_DIR, "file_index", digest + ".json")
+
+
+class FileIndex:
+	"""
+	Relative project paths, shortest first. For every ASCII character there is a
+	bitmask of the file names (and of the full paths) containing it, so a query
+	only verifies and scores the lines that have all of its characters.
+	"""
+	def __init__(self, root, paths):
+		self.root = root
+		self.paths = sorted(paths, key=lambda p: (len(p), p))
+		self.lower = [p.lower() for p in self.paths]
+		self.name_starts = array("l", (p.rfind("/") + 1 for p in self.lower))
+		self.names = [p[i:] for p, i in zip(self.lower, self.name_starts)]
+		self.name_order = sorted(range(len(self.paths)), key=self.names.__getitem__)
+		self.sorted_names = [self.names[i] for i in self.name_order]
+		self.name_masks = self._char_masks(self.names)
+		self.path_masks = self._char_masks(self.lower)
+
+	@staticmethod
+	def _char_masks(lines):
+		# Bit i is set when lines[i] contains the character.
+		chars = set()
+		for line in lines:
+			chars.update(line)
+		masks = {}
+		for ch in chars:
+			if ch < "\x80":
+				masks[ch] = int("".join(["1" if ch in line else "0" for line in reversed(lines)]), 2)
+		return masks
+
+	def __len__(self):
+		return len(self.paths)
+
+	def _score(self, query, i, start):
+		"""
+		fzf-style subsequence score of query in the lowercased path from start:
+		the earliest match, tightened backwards, earns bonuses for word
+		boundaries and consecutive characters and loses points for gaps.
+		"""
+		s = self.lower[i]
+		pos = start - 1
+		for ch in query:
+			pos = s.find(ch, pos + 1)
+			if pos < 0:
+				return None
+		end = pos + 1
+		positions = []
+		for ch in reversed(query):
+			end = s.rfind(ch, start, end)
+			positions.append(end)
+		positions.reverse()
+		# Lowercasing can change the length of a few non-ASCII paths.
+		path = self.paths[i] if len(self.paths[i]) == len(s) else s
+		name_start = self.name_starts[i]
+		score = -len(s)
+		prev = -2
+		for p in positions:
+			score += 16
+			if p == 0 or s[p - 1] in _QUICK_OPEN_BOUNDARIES or (path[p].isupper() and path[p - 1].islower()):
+				score += 24 if p == name_start else 12
+			elif p == prev + 1:
+				score += 10
+			elif prev >= 0:
+				score -= 2 + min(p - prev - 1, 8)
+			prev = p
+		return score
+
+	def _score_matches(self, query, scores, masks, lines, tier):
+		"""
+		Scores lines containing query as a subsequence into scores, skipping
+		lines that already have a score.
+		"""
+		mask = -1
+		for ch in set(query):
+			if ch < "\x80":
+				mask &= masks.get(ch, 0)
+		if mask == 0:
+			return
+		if mask < 0:
+			mask = (1 << len(lines)) - 1
+		# a[^\nb]*b[^\nc]*c: each gap stops at the next wanted character, so a line
+		# that cannot match is rejected in one pass instead of by backtracking.
+		pattern = re.compile(re.escape(query[0]) + "".join(f"[^\\n{re.escape(ch)}]*{re.escape(ch)}" for ch in query[1:]))
+		flags = format(mask, "b")[::-1].encode().translate(_BIT_FLAGS)
+		candidates = (m.start() for m in _FLAG_RE.finditer(flags))
+		scored = scanned = 0
+		while scanned < _QUICK_OPEN_SCANNED:
+			ids = list(itertools.islice(candidates, _QUICK_OPEN_BATCH))
+			if not ids:
+				return
+			scanned += len(ids)
+			batch = [lines[i] for i in ids]
+			line = 0
+			line_end = len(batch[0])
+			for m in pattern.finditer("\n".join(batch)):
+				while m.start() > line_end:
+					line += 1
+					line_end += len(batch[line]) + 1
+				i = ids[line]
+				if i in scores:
+					continue
+				scores[i] = tier + self._score(query, i, self.name_starts[i] if tier else 0)
+				scored += 1
+				if scored >= _QUICK_OPEN_SCORED:
+					return
+
+	def rank(self, query, limit=_QUICK_OPEN_RESULTS):
+		"""
+		Best matches first: file names starting with the query, then file names
+		containing it as a subsequence, then full paths containing it as a
+		subsequence; each tier is ordered by _score.
+		"""
+		query = "".join(query.lower().split())
+		if not query:
+			return self.paths[:limit]
+		scores = {}
+		if "/" not in query:
+			lo = bisect.bisect_left(self.sorted_names, query)
+			hi = bisect.bisect_left(self.sorted_names, query[:-1] + chr(ord(query[-1]) + 1), lo)
+			prefixed = self.name_order[lo:hi]
+			if len(prefixed) > _QUICK_OPEN_SCORED:
+				prefixed = heapq.nsmallest(_QUICK_OPEN_SCORED, prefixed)
+			for i in prefixed:
+				scores[i] = 2 * _QUICK_OPEN_TIER + self._score(query, i, self.name_starts[i])
+			if len(scores) < limit:
+				self._score_matches(query, scores, self.name_masks, self.names, _QUICK_OPEN_TIER)
+		if len(scores) < limit:
+			self._score_matches(query, scores, self.path_masks, self.lower, 0)
+		best = heapq.nlargest(limit, scores, key=lambda i: (scores[i], -i))
+		return [self.paths[i] for i in best]
+
+
+def refresh_file_index(root, rules, filetypes, cached_dirs, should_stop=None):
+	"""
+	Re-walks the project, reusing a cached directory listing whenever the
+	directory's mtime is unchanged, and returns the new {relative dir: [mtime,
+	subdirs, files]} mapping.
+	"""
+	listings = {}
+	pending = [""]
+	while pending:
+		if should_stop and should_stop():
+			return None
+		rel = pending.pop()
+		path = os.path.join(root, rel) if rel else root
+		try:
+			mtime = os.stat(path).st_mtime_ns
+		except OSError:
+			continue
+		cached = cached_dirs.get(rel)
+		if cached and cached[0] == mtime:
+			subdirs, files = cached[1], cached[2]
+		else:
+			subdirs, files = scan_project_directory(path, rules, filetypes)
+		listings[rel] = [mtime, subdirs, files]
+		pending.extend(rel + "/" + name if rel else name for name in subdirs)
+	return listings
+
+
+class FileIndexer(QThread):
+	"""
+	Loads the cached file index for a project root from USER_CONFIG_DIR,
+	publishes it straight away, then refreshes it from directory mtimes and
+	publishes and stores it again if anything changed.
+	"""
+	indexed = pyqtSignal(object)
+
+	def __init__(self, root, rules, filetypes, parent=None):
+		super().__init__(parent)
+		self.root = root
+		self.rules = rules
+		self.filetypes = filetypes
+		self._stopped = False
+
+	def stop(self):
+		self._stopped = True
+		self.wait()
+
+	@staticmethod
+	def _paths(listings):
+		return [rel + "/" + name if rel else name for rel, (_, _, files) in listings.items() for name in files]
+
+	def run(self):
+		cache_path = file_index_cache_path(self.root)
+		filters = [sorted(self.filetypes), self.rules.name_patterns, self.rules.path_patterns]
+		filters = json.loads(json.dumps(filters))
+		cached_dirs = {}
+		try:
+			with open(cache_path, "r", encoding="utf-8") as f:
+				data = json.load(f)
+			if data.get("version") == _FILE_INDEX_CACHE_VERSION and data.get("root") == self.root and data.get("filters") == filters:
+				cached_dirs = data.get("dirs", {})
+		except (OSError, ValueError):
+			pass
+		if cached_dirs:
+			self.indexed.emit(FileIndex(self.root, self._paths(cached_dirs)))
+
+		listings = refresh_file_index(self.root, self.rules, self.filetypes, cached_dirs, lambda: self._stopped)
+		if listings is None or listings == cached_dirs:
+			return
+		self.indexed.emit(FileIndex(self.root, self._paths(listings)))
+		try:
+			os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+			tmp_path = cache_path + ".tmp"
+			with open(tmp_path, "w", encoding="utf-8") as f:
+				json.dump({"version": _FILE_INDEX_CACHE_VERSION, "root": self.root, "filters": filters, "dirs": listings}, f)
+			os.replace(tmp_path, cache_path)
+		except OSError as e:
+			print("Failed to save file index:", e)
+
+
+class QuickOpenDialog(QDialog):
+	"""
+	Ctrl+P palette: type part of a path, Up/Down to pick, Enter to open.
+	"""
+	def __init__(self, parent=None):
+		super().__init__(parent)
+		self.setObjectName("quick_open")
+		self.setWindowTitle("Quick Open")
+		self.setMinimumWidth(520)
+		self.index = None
+		self.open_callback = None
+
+		layout = QVBoxLayout(self)
+		self.query_input = QLineEdit()
+		self.query_input.setPlaceholderText("Search files by name...")
+		self.query_input.installEventFilter(self)
+		layout.addWidget(self.query_input)
+		self.results = QListWidget()
+		layout.addWidget(self.results)
+		self.status_label = QLabel("")
+		layout.addWidget(self.status_label)
+
+		self.query_input.textChanged.connect(self.update_results)
+		self.query_input.returnPressed.connect(self.accept_current)
+		self.results.itemActivated.connect(self.accept_current)
+
+	def set_index(self, index):
+		self.index = index
+		self.update_results()
+
+	def update_results(self):
+		self.results.clear()
+		if self.index is None:
+			self.status_label.setText("Indexing...")
+			return
+		for path in self.index.rank(self.query_input.text()):
+			self.results.addItem(path)
+		if self.results.count():
+			self.results.setCurrentRow(0)
+		self.status_label.setText(f"{len(self.index)} files")
+
+	def eventFilter(self, obj, event):
+		if obj is self.query_input and event.type() == QEvent.KeyPress and event.key() in (Qt.Key_Up, Qt.Key_Down, Qt.Key_PageUp, Qt.Key_PageDown):
+			QApplication.sendEvent(self.results, event)
+			return True
+		return super().eventFilter(obj, event)
+
+	def accept_current(self, *args):
+		item = self.results.currentItem()
+		if item is None or self.index is None:
+			return
+		self.accept()
+		if self.open_callback:
+			self.open_callback(os.path.join(self.index.root, item.text()))
+
+
+_SEARCH_BATCH_FILES = 32
+_SEARCH_MAX_HITS_PER_FILE = 500
+_SEARCH_LINE_PREVIEW = 300
+_search_pool = None
+
+
+def search_file_batch(paths, pattern, flags):
+	"""
+	Process-pool worker: searches each file through a read-only mmap and returns
+	[(path, [(line number, preview), ...]), ...] for files with at least one hit.
+	The pattern is a bytes regex, so case folding and classes like \\w are ASCII-only.
+	"""
+	regex = re.compile(pattern, flags)
+	results = []
+	for path in paths:
+		try:
+			with open(path, "rb") as f:
+				if os.fstat(f.fileno()).st_size == 0:
+					continue
+				with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+					hits = []
+					line_no, counted_to = 1, 0
+					last_line = -1
+					for m in regex.finditer(mapped):
+						line_no += mapped[counted_to:m.start()].count(b"\n")
+						counted_to = m.start()
+						if line_no == last_line:
+							continue
+						last_line = line_no
+						line_start = mapped.rfind(b"\n", 0, m.start()) + 1
+						line_end = mapped.find(b"\n", m.start())
+						if line_end < 0:
+							line_end = len(mapped)
+						line_end = min(line_end, line_start + _SEARCH_LINE_PREVIEW)
+						preview = mapped[line_start:line_end].decode("utf-8", errors="replace").strip()
+						hits.append((line_no, preview))
+						if len(hits) >= _SEARCH_MAX_HITS_PER_FILE:
+							break
+					if hits:
+						results.append((path, hits))
+		except (OSError, ValueError):
+			continue
+	return results
+
+
+def get_search_pool():
+	global _search_pool
+	if _search_pool is None:
+		_search_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 2, mp_context=multiprocessing.get_context("spawn"))
+		atexit.register(_search_pool.shutdown, wait=False, cancel_futures=True)
+	return _search_pool
+
+
+class ProjectSearch(QThread):
+	"""
+	Walks the project on this thread and fans candidate files out to the process
+	pool in small batches, emitting each batch's hits as soon as it completes.
+	"""
+	file_results = pyqtSignal(str, list)
+	progress = pyqtSignal(int, int)
+
+	def __init__(self, root, rules, filetypes, pattern, flags, parent=None):
+		super().__init__(parent)
+		self.root = root
+		self.rules = rules
+		self.filetypes = filetypes
+		self.pattern = pattern
+		self.flags = flags
+		self.cancelled = False
+
+	def cancel(self):
+		self.cancelled = True
+
+	def run(self):
+		pool = get_search_pool()
+		limit = (os.cpu_count() or 2) * 4
+		futures = {}
+		queued = done = 0
+		batch = []
+
+		def drain(timeout):
+			nonlocal done
+			finished, _ = wait_futures(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+			for future in finished:
+				count = futures.pop(future)
+				if future.cancelled():
+					continue
+				done += count
+				try:
+					results = future.result()
+				except Exception as e:
+					print("Find in files worker error:", e)
+					continue
+				for path, hits in results:
+					self.file_results.emit(path, hits)
+			self.progress.emit(done, queued)
+
+		def submit(paths):
+			future = pool.submit(search_file_batch, paths, self.pattern, self.flags)
+			futures[future] = len(paths)
+
+		for path in walk_project_files(self.root, self.rules, self.filetypes, lambda: self.cancelled):
+			batch.append(path)
+			queued += 1
+			if len(batch) >= _SEARCH_BATCH_FILES:
+				submit(batch)
+				batch = []
+				while len(futures) >= limit and not self.cancelled:
+					drain(0.1)
+		if batch and not self.cancelled:
+			submit(batch)
+		while futures and not self.cancelled:
+			drain(0.1)
+		for future in futures:
+			future.cancel()
+		self.progress.emit(done, queued)
+
+
+class ProjectSearchDock(QDockWidget):
+	def __init__(self, parent=None):
+		super().__init__("Find in Files", parent)
+		self.setAllowedAreas(Qt.BottomDockWidgetArea | Qt.TopDockWidgetArea | Qt.LeftDockWidgetArea | Qt.RightDockWidgetArea)
+
+		container = QWidget()
+		layout = QVBoxLayout(container)
+
+		input_layout = QHBoxLayout()
+		self.query_input = QLineEdit()
+		self.query_input.setPlaceholderText("Search in project...")
+		input_layout.addWidget(self.query_input)
+		self.case_checkbox = QCheckBox("Case Sensitive")
+		input_layout.addWidget(self.case_checkbox)
+		self.regex_checkbox = QCheckBox("Regex")
+		input_layout.addWidget(self.regex_checkbox)
+		self.search_button = QPushButton("Search")
+		input_layout.addWidget(self.search_button)
+		self.cancel_button = QPushButton("Cancel")
+		self.cancel_button.setEnabled(False)
+		input_layout.addWidget(self.cancel_button)
+		layout.addLayout(input_layout)
+
+		self.status_label = QLabel("")
+		layout.addWidget(self.status_label)
+
+		self.results = QTreeWidget()
+		self.results.setHeaderHidden(True)
+		layout.addWidget(self.results)
+
+		self.setWidget(container)
+
+
+class DiscordRPCManager:
+	"""
+	Rich presence on a daemon thread. update() only records the newest state and
+	wakes the worker, which connects lazily, retries with backoff while Discord
+	is unavailable and sends at most one update per UPDATE_INTERVAL, always the
+	latest state. pypresence is only ever imported and used on the worker.
+	"""
+	UPDATE_INTERVAL = 15.0
+	RETRY_DELAYS = (5.0, 15.0, 30.0, 60.0, 120.0)
+
+	def __init__(self, client_id, app_name="TLINT Editor"):
+		self.client_id = str(client_id)
+		self.app_name = app_name
 		self.RPC = None
 		self.connected = False
+		self._cond = threading.Condition()
+		self._filename = None
+		self._dirty = False
+		self._stopping = False
+		self._thread = None
 
 	def connect(self):
-		try:
-			self.RPC = Presence(self.client_id)
-			self.RPC.connect()
-			self.connected = True
-		except Exception as e:
-			print("Discord RPC connect failed:", e)
-			self.connected = False
+		"""
+		Starts the worker; the IPC connection itself is made on the worker thread.
+		"""
+		with self._cond:
+			if self._thread is None and not self._stopping:
+				self._thread = threading.Thread(target=self._run, name="discord-rpc", daemon=True)
+				self._thread.start()
 
 	def update(self, filename=None):
-		if not self.connected:
+		with self._cond:
+			self._filename = filename
+			self._dirty = True
+			self._cond.notify()
+		self.connect()
+
+	def _open(self):
+		from pypresence import Presence
+		self.RPC = Presence(self.client_id)
+		self.RPC.connect()
+		self.connected = True
+
+	def _drop(self):
+		if self.RPC:
+			for call in (self.RPC.clear, self.RPC.close):
+				try:
+					call()
+				except Exception:
+					pass
+		self.RPC = None
+		self.connected = False
+
+	def _run(self):
+		failures = 0
+		next_send = 0.0
+		while True:
+			with self._cond:
+				while not self._stopping:
+					delay = next_send - time.monotonic()
+					if self._dirty and delay <= 0:
+						break
+					self._cond.wait(delay if self._dirty else None)
+				if self._stopping:
+					break
+				filename = self._filename
+				self._dirty = False
+
+			try:
+				if not self.connected:
+					self._open()
+				self.RPC.update(
+					state=status,
+					details=f'Editing "{filename}"' if filename else "No file open",
+					large_image="large",
+					large_text=self.app_name
+				)
+				failures = 0
+				next_send = time.monotonic() + self.UPDATE_INTERVAL
+			except Exception as e:
+				if failures == 0:
+					print("Discord RPC unavailable, retrying in the background:", e)
+				self._drop()
+				next_send = time.monotonic() + self.RETRY_DELAYS[min(failures, len(self.RETRY_DELAYS) - 1)]
+				failures += 1
+				with self._cond:
+					self._dirty = True
+		self._drop()
+
+	def close(self, timeout=2.0):
+		with self._cond:
+			self._stopping = True
+			self._cond.notify()
+			thread = self._thread
+		if thread is not None:
+			thread.join(timeout)
+
+_SHELL_REAP_SECONDS = 2.0
+
+
+def _reap_shell(pid):
+	"""
+	Waits for a hung-up shell off the GUI thread so it does not linger as a
+	zombie, killing it if it is still running after _SHELL_REAP_SECONDS.
+	"""
+	deadline = time.monotonic() + _SHELL_REAP_SECONDS
+	while time.monotonic() < deadline:
+		try:
+			done, _ = os.waitpid(pid, os.WNOHANG)
+		except ChildProcessError:
+			return
+		if done:
 			return
+		time.sleep(0.05)
+	try:
+		os.kill(pid, signal.SIGKILL)
+	except OSError:
+		pass
+	try:
+		os.waitpid(pid, 0)
+	except ChildProcessError:
+		pass
+
+
+class ShellSession(QObject):
+	"""
+	One long-lived interactive shell behind a pty. Each command is wrapped in a
+	brace group followed by a printf sentinel carrying $?, so command boundaries
+	are found in the output stream while cwd and environment persist.
+	"""
+	output = pyqtSignal(str)
+	command_finished = pyqtSignal(int)
+	closed = pyqtSignal()
+
+	def __init__(self, argv, init_command, parent=None):
+		super().__init__(parent)
+		self.argv = argv
+		self.init_command = init_command
+		self.token = uuid.uuid4().hex
+		self.marker = f"__TLITE_{self.token}_"
+		self.sentinel = re.compile(re.escape(self.marker) + r"(\d+)__:(-?\d+)\r?\n")
+		self.pid = None
+		self.fd = None
+		self.notifier = None
+		self.write_notifier = None
+		self._outgoing = bytearray()
+		self.ready = False
+		self.running = False
+		self.interrupted = False
+		self._seq = 0
+		self._buffer = ""
+		self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+	@staticmethod
+	def available():
+		return pty is not None
+
+	def start(self):
+		env = dict(os.environ, TERM="dumb", PAGER="cat", GIT_PAGER="cat")
+		pid, fd = pty.fork()
+		if pid == 0:
+			try:
+				os.execvpe(self.argv[0], self.argv, env)
+			finally:
+				os._exit(127)
+		self.pid, self.fd = pid, fd
 		try:
-			self.RPC.update(
-				state=status,
-				details=f'Editing "{filename}"' if filename else "No file open",
-				large_image="large",
-				large_text="TLINT Editor"
-			)
-		except Exception as e:
-			print("Discord RPC update failed:", e)
+			attrs = termios.tcgetattr(fd)
+			attrs[3] &= ~termios.ECHO
+			termios.tcsetattr(fd, termios.TCSANOW, attrs)
+		except termios.error:
+			pass
+		os.set_blocking(fd, False)
+		self.notifier = QSocketNotifier(fd, QSocketNotifier.Read, self)
+		self.notifier.activated.connect(self._on_readable)
+		self.write_notifier = QSocketNotifier(fd, QSocketNotifier.Write, self)
+		self.write_notifier.setEnabled(False)
+		self.write_notifier.activated.connect(self._flush_outgoing)
+		self._write(f"{self.init_command}\n{self._sentinel_command()}\n")
+
+	def _sentinel_command(self):
+		return f"printf '__TLITE_%s_%s__:%s\\n' {self.token} {self._seq} \"$?\""
+
+	def _write(self, text):
+		self._outgoing += text.encode("utf-8")
+		self._flush_outgoing()
+
+	def _flush_outgoing(self):
+		"""
+		Writes as much queued input as the pty takes without blocking; the rest
+		is sent when the write notifier reports the pty writable again.
+		"""
+		while self._outgoing and self.fd is not None:
+			try:
+				written = os.write(self.fd, self._outgoing)
+			except BlockingIOError:
+				break
+			except OSError:
+				self._outgoing.clear()
+				break
+			del self._outgoing[:written]
+		if self.write_notifier is not None:
+			self.write_notifier.setEnabled(bool(self._outgoing))
+
+	def run(self, command):
+		self._seq += 1
+		self.running = True
+		self.interrupted = False
+		# stdin comes from /dev/null: the dock has no way to type into a running
+		# command, and a command reading the pty would swallow the sentinel line.
+		self._write(f"{{ {command}\n}} </dev/null; {self._sentinel_command()}\n")
+
+	def interrupt(self):
+		if not self.running:
+			return False
+		self.interrupted = True
+		self._write("\x03")
+		self._write(f"{self._sentinel_command()}\n")
+		return True
+
+	def _on_readable(self):
+		chunks = []
+		while True:
+			try:
+				data = os.read(self.fd, 65536)
+			except BlockingIOError:
+				break
+			except OSError:
+				data = b""
+			if not data:
+				self._consume("".join(chunks))
+				self.close()
+				return
+			chunks.append(self._decoder.decode(data))
+		self._consume("".join(chunks))
+
+	def _consume(self, text):
+		self._buffer += text.replace("\r\n", "\n").replace("\r", "")
+		while True:
+			m = self.sentinel.search(self._buffer)
+			if m:
+				self._emit(self._buffer[:m.start()])
+				self._buffer = self._buffer[m.end():]
+				seq, code = int(m.group(1)), int(m.group(2))
+				if seq == 0:
+					self.ready = True
+				elif seq == self._seq and self.running:
+					self.running = False
+					self.command_finished.emit(code)
+				continue
+			hold = self._buffer.find(self.marker)
+			if hold < 0:
+				hold = len(self._buffer)
+				for k in range(min(len(self.marker), len(self._buffer)), 0, -1):
+					if self._buffer.endswith(self.marker[:k]):
+						hold -= k
+						break
+			self._emit(self._buffer[:hold])
+			self._buffer = self._buffer[hold:]
+			return
+
+	def _emit(self, text):
+		if text and self.ready:
+			self.output.emit(text)
+
+	def close(self):
+		for notifier in (self.notifier, self.write_notifier):
+			if notifier is not None:
+				notifier.setEnabled(False)
+		self.notifier = self.write_notifier = None
+		self._outgoing.clear()
+		if self.pid is not None:
+			try:
+				os.kill(self.pid, signal.SIGHUP)
+			except OSError:
+				pass
+			threading.Thread(target=_reap_shell, args=(self.pid,), name="shell-reaper", daemon=True).start()
+			self.pid = None
+		if self.fd is not None:
+			try:
+				os.close(self.fd)
+			except OSError:
+				pass
+			self.fd = None
+			self.closed.emit()
 
-	def close(self):
-		try:
-			if self.RPC:
-				try:
-					self.RPC.clear()
-				except Exception:
-					pass
-				try:
-					self.RPC.close()
-				except Exception:
-					pass
-		finally:
-			self.connected = False
 
 class TerminalLineEdit(QLineEdit):
 	"""
-	QLineEdit subclass that routes Up/Down keys to the main window's history navigation.
+	QLineEdit subclass that routes Up/Down keys to the main window's history navigation
+	and Ctrl+C (with nothing selected) to cancelling the running command.
 	"""
 	def __init__(self, mainwindow=None, *args, **kwargs):
 		super().__init__(*args, **kwargs)
 		self.mainwindow = mainwindow
 
 	def keyPressEvent(self, event):
+		if (self.mainwindow and event.key() == Qt.Key_C and event.modifiers() & Qt.ControlModifier
+				and not self.hasSelectedText()):
+			if self.mainwindow.cancel_terminal_command():
+				return
 		if self.mainwindow and event.key() in (Qt.Key_Up, Qt.Key_Down):
 			if event.key() == Qt.Key_Up:
 				self.mainwindow.navigate_history(-1)
@@ -612,13 +3646,15 @@ class TerminalLineEdit(QLineEdit):
 
 
 class MainWindow(QMainWindow):
+	save_finished = pyqtSignal(object, object)
+
 	def __init__(self):
 		super().__init__()
 		self.setWindowTitle("TLintITE")
 		DISCORD_CLIENT_ID = "1433877002783428648"
 		self.discord_rpc = DiscordRPCManager(DISCORD_CLIENT_ID, app_name="TLINT Editor")
-		self.discord_rpc.connect()
 		atexit.register(self.discord_rpc.close)
+		self._presence_ready = False
 
 		self.load_keybinds()
 
@@ -646,8 +3682,97 @@ class MainWindow(QMainWindow):
 
 		self.suggestions_enabled = False
 
-		self.find_dock = FindReplaceDock(self)
+		self.find_dock = None
+		self.terminal_dock = None
+		self.search_dock = None
+		self.project_search = None
+		self._search_hits = 0
+		self.file_index = None
+		self.file_indexer = None
+		self.quick_open_dialog = None
+		STARTUP_TRACE.mark("window: tabs, menus and status bar")
+
+		self.instaplace_enabled = False
+		self.instaplace_rules = []
+		self.instaplace_index = None
+		self.instaplace_engine = None
+		self._applying_instaplace = False
+		self.load_instaplace_rules()
+
+		self.plain_paste_checkbox = QCheckBox("Clean Paste")
+		self.statusBar().addPermanentWidget(self.plain_paste_checkbox)
+
+		self.latency_label = QLabel()
+		self.latency_label.setObjectName("latency_overlay")
+		self.latency_label.setToolTip("Keystroke pipeline latency, p50/p99 in ms over the last 512 samples per stage")
+		self.latency_label.hide()
+		self.statusBar().addPermanentWidget(self.latency_label)
+		self.latency_timer = QTimer(self)
+		self.latency_timer.setInterval(500)
+		self.latency_timer.timeout.connect(self.update_latency_overlay)
+
+		self.current_file_path = None
+
+		self.supported_filetypes = load_supported_filetypes()
+
+		self.terminal_history = []
+		self._history_index = len(self.terminal_history)
+		self.terminal_process = None
+		self.terminal_session = None
+		self.shell_sessions = {}
+		self._terminal_pending = []
+		STARTUP_TRACE.mark("window: rules")
+
+		self.autosave_dir = os.path.join(AUTOSAVE_DIR, uuid.uuid4().hex)
+		try:
+			os.makedirs(self.autosave_dir, exist_ok=True)
+			open(os.path.join(self.autosave_dir, "heartbeat"), "w").close()
+		except OSError as e:
+			print("Autosave unavailable:", e)
+		self.autosave_timer = QTimer(self)
+		self.autosave_timer.setInterval(_AUTOSAVE_INTERVAL_MS)
+		self.autosave_timer.timeout.connect(self._flush_journals)
+		self.autosave_timer.start()
+		self._saves_in_flight = set()
+		self.save_finished.connect(self._on_save_finished)
+		self.config_watcher = None
+
+		self._startup_steps = [
+			("terminal dock", self._ensure_terminal_dock),
+			("file browser", self._ensure_file_browser),
+			("presence", self._start_presence),
+			("recovery", self.recover_journals),
+			("config watcher", self._start_config_watcher),
+		]
+		self._startup_shown = False
 
+	def showEvent(self, event):
+		super().showEvent(event)
+		if not self._startup_shown:
+			self._startup_shown = True
+			QTimer.singleShot(0, self._run_startup_step)
+
+	def _run_startup_step(self):
+		"""
+		Builds the deferred parts of the window one per event-loop turn after the
+		first paint, so input is never blocked for more than one step.
+		"""
+		if not self._startup_steps:
+			return
+		if self._startup_steps[0][0] == "terminal dock":
+			STARTUP_TRACE.mark("first paint")
+		name, step = self._startup_steps.pop(0)
+		try:
+			step()
+		except Exception as e:
+			print(f"Startup step '{name}' failed:", e)
+		STARTUP_TRACE.mark("idle: " + name)
+		if self._startup_steps:
+			QTimer.singleShot(0, self._run_startup_step)
+
+	def _ensure_terminal_dock(self):
+		if self.terminal_dock is not None:
+			return self.terminal_dock
 		self.terminal_dock = QDockWidget("Terminal", self)
 		self.terminal_dock.setAllowedAreas(Qt.BottomDockWidgetArea)
 
@@ -685,26 +3810,50 @@ class MainWindow(QMainWindow):
 
 		self.terminal_dock.setWidget(terminal_container)
 		self.addDockWidget(Qt.BottomDockWidgetArea, self.terminal_dock)
+		return self.terminal_dock
 
+	def _ensure_find_dock(self):
+		if self.find_dock is not None:
+			return self.find_dock
+		self.find_dock = FindReplaceDock(self)
 		self.addDockWidget(Qt.BottomDockWidgetArea, self.find_dock)
 		self.find_dock.hide()
 		self.find_dock.find_button.clicked.connect(lambda: self.find_text_docked(self.find_dock))
 		self.find_dock.replace_button.clicked.connect(lambda: self.replace_text(self.find_dock))
 		self.find_dock.replace_all_button.clicked.connect(lambda: self.replace_all_text(self.find_dock))
+		return self.find_dock
+
+	def _ensure_search_dock(self):
+		if self.search_dock is not None:
+			return self.search_dock
+		self.search_dock = ProjectSearchDock(self)
+		self.addDockWidget(Qt.BottomDockWidgetArea, self.search_dock)
+		self.search_dock.hide()
+		self.search_dock.query_input.returnPressed.connect(self.start_project_search)
+		self.search_dock.search_button.clicked.connect(self.start_project_search)
+		self.search_dock.cancel_button.clicked.connect(self.cancel_project_search)
+		self.search_dock.results.itemActivated.connect(self.open_search_result)
+		return self.search_dock
+
+	def _ensure_file_browser(self):
+		if self.file_browser is not None:
+			return self.file_browser
+		self.file_browser = QDockWidget("File Browser", self)
 
-		self.instaplace_enabled = False
-		self.instaplace_rules = []
-		self.load_instaplace_rules()
-
-		self.plain_paste_checkbox = QCheckBox("Clean Paste")
-		self.statusBar().addPermanentWidget(self.plain_paste_checkbox)
+		self.tree_view = QTreeView()
+		self.tree_view.setModel(self.file_model)
+		self.tree_view.doubleClicked.connect(self.open_file_from_browser)
 
-		self.current_file_path = None
+		header = self.tree_view.header()
+		header.setSectionResizeMode(0, QHeaderView.Interactive)
+		header.resizeSection(0, 260)
 
-		self.supported_filetypes = load_supported_filetypes()
+		self.tree_view.setContextMenuPolicy(Qt.CustomContextMenu)
+		self.tree_view.customContextMenuRequested.connect(self.on_tree_context_menu)
 
-		self.terminal_history = []
-		self._history_index = len(self.terminal_history)
+		self.file_browser.setWidget(self.tree_view)
+		self.addDockWidget(Qt.LeftDockWidgetArea, self.file_browser)
+		return self.file_browser
 
 	def indent_selection(self):
 		editor = self.current_editor()
@@ -824,10 +3973,173 @@ class MainWindow(QMainWindow):
 			QMessageBox.information(self, "Error reloading keybindings", str(e))
 
 
+	_LATENCY_STAGES = (
+		("keypress", "key"),
+		("highlight", "lint"),
+		("brackets", "brackets"),
+		("suggestions", "suggest"),
+		("instaplace", "instaplace"),
+		("counters.tab", "count"),
+		("counters.window", "status"),
+	)
+
+	def set_latency_overlay(self, enabled):
+		LATENCY.enabled = enabled
+		if enabled:
+			LATENCY.clear()
+			self.update_latency_overlay()
+			self.latency_label.show()
+			self.latency_timer.start()
+		else:
+			self.latency_timer.stop()
+			self.latency_label.hide()
+
+	def update_latency_overlay(self):
+		parts = []
+		for stage, label in self._LATENCY_STAGES:
+			stats = LATENCY.percentiles(stage)
+			if stats:
+				parts.append(f"{label} {stats[0]:.1f}/{stats[1]:.1f}")
+		self.latency_label.setText(" | ".join(parts) if parts else "latency: waiting for input")
+
+	def dump_latency_samples(self):
+		if not LATENCY.samples:
+			QMessageBox.information(self, "Latency", "No samples recorded yet. Enable Window > Latency Overlay and type for a while first.")
+			return
+		path = os.path.join(USER_CONFIG_DIR, "latency", time.strftime("latency-%Y%m%d-%H%M%S.jsonl"))
+		try:
+			count = LATENCY.dump(path)
+			self.statusBar().showMessage(f"Wrote {count} latency samples to {path}", 5000)
+		except Exception as e:
+			QMessageBox.information(self, "Error:", str(e))
+
+	def _attach_journal(self, tab, path=None, skip=0):
+		title = os.path.basename(path) if path else "Untitled"
+		tab.journal = EditJournal(self.autosave_dir, tab.editor.document(), title, path, skip)
+
+	def _flush_journals(self):
+		for tab in self.editor_tabs():
+			journal = getattr(tab, "journal", None)
+			if journal is None:
+				continue
+			try:
+				journal.flush()
+			except Exception as e:
+				print("Autosave failed:", e)
+		try:
+			os.utime(os.path.join(self.autosave_dir, "heartbeat"))
+		except OSError:
+			pass
+
+	def recover_journals(self):
+		orphans = find_orphaned_journals(self.autosave_dir)
+		if not orphans:
+			return
+		reply = QMessageBox.question(
+			self, "Recover Documents",
+			f"TLintITE did not shut down cleanly. Recover {len(orphans)} unsaved document(s)?",
+			QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes
+		)
+		errors = []
+		if reply == QMessageBox.Yes:
+			for meta_path in orphans:
+				try:
+					meta, text = replay_journal(meta_path)
+				except Exception as e:
+					errors.append(f"{os.path.basename(meta_path)}: {e}")
+					continue
+				self.new_document()
+				tab = self.current_tab()
+				tab.load_text(text)
+				tab.path = meta.get("path")
+				title = meta.get("title", "Untitled")
+				self.tabs.setTabText(self.tabs.currentIndex(), f"{title} (recovered)")
+				# The file on disk no longer matches, so start from a snapshot.
+				tab.journal.path = tab.path
+				tab.journal.title = title
+				tab.journal.compact()
+		for session_dir in {os.path.dirname(path) for path in orphans}:
+			shutil.rmtree(session_dir, ignore_errors=True)
+		if errors:
+			QMessageBox.information(self, "Error:", "Could not recover:\n" + "\n".join(errors))
+
+	_WATCHED_CONFIGS = ("linting.json", "instaplace.json", "filetypes.json", "ignore.json")
+
+	def _start_config_watcher(self):
+		"""
+		Watches the config directory (editors often save by renaming over the
+		file, which only the directory sees) and the rule files themselves, and
+		reloads whatever changed once writes have been quiet for 300 ms.
+		"""
+		self._config_stamps = {name: file_stamp(get_user_config_path(name)) for name in self._WATCHED_CONFIGS}
+		self.config_reload_timer = QTimer(self)
+		self.config_reload_timer.setSingleShot(True)
+		self.config_reload_timer.setInterval(300)
+		self.config_reload_timer.timeout.connect(self.reload_changed_configs)
+		self.config_watcher = QFileSystemWatcher(self)
+		self.config_watcher.directoryChanged.connect(self.config_reload_timer.start)
+		self.config_watcher.fileChanged.connect(self.config_reload_timer.start)
+		self._watch_config_files()
+
+	def _watch_config_files(self):
+		watched = set(self.config_watcher.files()) | set(self.config_watcher.directories())
+		paths = [USER_CONFIG_DIR] + [get_user_config_path(name) for name in self._WATCHED_CONFIGS]
+		missing = [path for path in paths if path not in watched and os.path.exists(path)]
+		if missing:
+			self.config_watcher.addPaths(missing)
+
+	def reload_changed_configs(self):
+		self._watch_config_files()
+		reloaded = []
+		for name in self._WATCHED_CONFIGS:
+			path = get_user_config_path(name)
+			stamp = file_stamp(path)
+			if stamp == self._config_stamps.get(name):
+				continue
+			if stamp is not None:
+				try:
+					with open(path, "r", encoding="utf-8") as f:
+						json.load(f)
+				except (OSError, ValueError) as e:
+					# Usually a half-written save; keep the old rules until it parses.
+					self.statusBar().showMessage(f"{name}: {e}; keeping the previous rules", 5000)
+					continue
+			self._config_stamps[name] = stamp
+			reloaded.append(name)
+
+		if "linting.json" in reloaded:
+			self.apply_lint_rules()
+		if "instaplace.json" in reloaded:
+			self.reload_instaplace()
+		if "filetypes.json" in reloaded or "ignore.json" in reloaded:
+			self.supported_filetypes = load_supported_filetypes()
+			self.file_model.set_filters(self.supported_filetypes, load_ignore_patterns())
+		if reloaded:
+			self.statusBar().showMessage("Reloaded " + ", ".join(reloaded), 3000)
+
+	def apply_lint_rules(self, force=False):
+		"""
+		Points every tab at the current compiled rules for its linting.json and
+		rehighlights only the blocks whose words changed. force recompiles even
+		if the file looks unchanged.
+		"""
+		compiled = {}
+		for tab in self.editor_tabs():
+			path = tab.linter.rules_path
+			if path not in compiled:
+				compiled[path] = LINT_RULES.reload(path) if force else LINT_RULES.get(path)
+			tab.linter.update_rule_set(compiled[path])
+
+	def _start_presence(self):
+		self._presence_ready = True
+		self._update_discord_rpc()
+
 	def _update_discord_rpc(self):
+		if not self._presence_ready:
+			return
 		tab = self.current_tab()
 		filename = None
-		if isinstance(tab, TextEditorTab) and getattr(tab, "path", None):
+		if isinstance(tab, (TextEditorTab, LargeFileTab)) and getattr(tab, "path", None):
 			filename = os.path.basename(tab.path)
 		elif isinstance(tab, TextEditorTab):
 			filename = "Untitled"
@@ -870,6 +4182,7 @@ class MainWindow(QMainWindow):
 			tab = self.tabs.widget(i)
 			if isinstance(tab, TextEditorTab):
 				tab.instaplace_rules = self.instaplace_rules if self.instaplace_enabled else []
+				tab.instaplace_index = self.instaplace_index
 				tab.suggestions_enabled = self.suggestions_enabled
 
 	def reload_all_rules(self):
@@ -890,52 +4203,183 @@ class MainWindow(QMainWindow):
 			self.terminal_input.clear()
 			return
 
+		if self.terminal_process is not None or (self.terminal_session and self.terminal_session.running):
+			self._finish_terminal_line()
+			self._append_terminal_text("[busy] A command is still running (Ctrl+C to cancel).\n")
+			return
+
 		profile = self.terminal_profile_combo.currentText()
 
 		self.terminal_history.append(command)
 		self._history_index = len(self.terminal_history)
 
-		self.terminal_output.appendPlainText(f"> {command}")
-
-		try:
-			proc_args = None
-			if profile.lower() in ("bash",):
-				proc_args = ["/bin/bash", "-ic", command]
-			elif profile.lower() in ("zsh",):
-				proc_args = ["/bin/zsh", "-ic", command]
-			elif profile.lower() in ("fish",):
-				proc_args = ["fish", "-c", command]
-			elif profile.lower().startswith("terminal") and sys.platform == "darwin":
-				proc_args = ["/bin/zsh", "-ic", command]
-			elif profile.lower() in ("powershell", "powershell.exe"):
-				proc_args = ["powershell", "-NoProfile", "-Command", command]
-			elif profile.lower() == "cmd":
-				proc_args = ["cmd", "/C", command]
-			else:
-				result = subprocess.run(command, shell=True, check=False, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-				output = result.stdout.strip()
-				error = result.stderr.strip()
-				if output:
-					self.terminal_output.appendPlainText(output)
-				if error:
-					self.terminal_output.appendPlainText(f"[stderr]\n{error}")
-				self.terminal_input.clear()
-				return
+		self._finish_terminal_line()
+		self._append_terminal_text(f"> {command}\n")
 
-			result = subprocess.run(proc_args, check=False, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-			output = result.stdout.strip()
-			error = result.stderr.strip()
+		self._terminal_pending = []
+		self._terminal_cancelled = False
+		session = self._shell_session(profile)
+		if session is not None:
+			self.terminal_session = session
+			session.run(command)
+			self.terminal_input.clear()
+			return
 
-			if output:
-				self.terminal_output.appendPlainText(output)
-			if error:
-				self.terminal_output.appendPlainText(f"[stderr]\n{error}")
+		proc_args = self._terminal_command_args(profile, command)
+		encoding = locale.getpreferredencoding(False)
+		self._terminal_decoders = {
+			QProcess.StandardOutput: codecs.getincrementaldecoder(encoding)(errors="replace"),
+			QProcess.StandardError: codecs.getincrementaldecoder(encoding)(errors="replace"),
+		}
+		self._terminal_pending = []
+		self._terminal_cancelled = False
 
-		except Exception as e:
-			self.terminal_output.appendPlainText(f"[error] {str(e)}")
+		process = QProcess(self)
+		process.readyReadStandardOutput.connect(lambda: self._on_terminal_ready(QProcess.StandardOutput))
+		process.readyReadStandardError.connect(lambda: self._on_terminal_ready(QProcess.StandardError))
+		process.finished.connect(self._on_terminal_finished)
+		process.errorOccurred.connect(self._on_terminal_error)
+		self.terminal_process = process
+		process.start(proc_args[0], proc_args[1:])
 
 		self.terminal_input.clear()
 
+	_SHELL_SESSION_SPECS = {
+		"bash": (["/bin/bash", "--noediting", "-i"], "PS1=''; PS2=''; PROMPT_COMMAND=''; stty -echo"),
+		"zsh": (["/bin/zsh", "-o", "nozle", "-i"], "PROMPT=''; RPROMPT=''; PS2=''; unsetopt prompt_cr prompt_sp; stty -echo"),
+	}
+
+	def _shell_session(self, profile):
+		key = profile.lower()
+		if key.startswith("terminal") and sys.platform == "darwin":
+			key = "zsh"
+		spec = self._SHELL_SESSION_SPECS.get(key)
+		if spec is None or not ShellSession.available() or not os.path.exists(spec[0][0]):
+			return None
+		session = self.shell_sessions.get(key)
+		if session is None:
+			session = ShellSession(*spec, parent=self)
+			session.output.connect(lambda text: self._on_terminal_text(QProcess.StandardOutput, text))
+			session.command_finished.connect(self._on_session_finished)
+			session.closed.connect(lambda key=key, session=session: self._on_session_closed(key, session))
+			try:
+				session.start()
+			except OSError as e:
+				self._finish_terminal_line()
+				self._append_terminal_text(f"[error] {e}\n")
+				return None
+			self.shell_sessions[key] = session
+		return session
+
+	def _on_session_finished(self, exit_code):
+		session = self.terminal_session
+		self._flush_terminal_output()
+		self._finish_terminal_line()
+		if session is not None and session.interrupted:
+			self._append_terminal_text("[cancelled]\n")
+		else:
+			self._append_terminal_text(f"[exit {exit_code}]\n")
+		self.terminal_session = None
+
+	def _on_session_closed(self, key, session):
+		if self.shell_sessions.get(key) is session:
+			del self.shell_sessions[key]
+		if self.terminal_session is session:
+			self._flush_terminal_output()
+			self._finish_terminal_line()
+			self._append_terminal_text("[shell exited]\n")
+			self.terminal_session = None
+		session.deleteLater()
+
+	@staticmethod
+	def _terminal_command_args(profile, command):
+		profile = profile.lower()
+		if profile in ("bash",):
+			return ["/bin/bash", "-ic", command]
+		elif profile in ("zsh",):
+			return ["/bin/zsh", "-ic", command]
+		elif profile in ("fish",):
+			return ["fish", "-c", command]
+		elif profile.startswith("terminal") and sys.platform == "darwin":
+			return ["/bin/zsh", "-ic", command]
+		elif profile in ("powershell", "powershell.exe"):
+			return ["powershell", "-NoProfile", "-Command", command]
+		elif profile == "cmd" or sys.platform.startswith("win"):
+			return ["cmd", "/C", command]
+		return ["/bin/sh", "-c", command]
+
+	def _on_terminal_ready(self, channel):
+		process = self.terminal_process
+		if process is None:
+			return
+		process.setReadChannel(channel)
+		data = bytes(process.readAll())
+		if not data:
+			return
+		self._on_terminal_text(channel, self._terminal_decoders[channel].decode(data))
+
+	def _on_terminal_text(self, channel, text):
+		if not text:
+			return
+		if not self._terminal_pending:
+			QTimer.singleShot(0, self._flush_terminal_output)
+		self._terminal_pending.append((channel, text))
+
+	def _flush_terminal_output(self):
+		pending, self._terminal_pending = self._terminal_pending, []
+		stderr_format = QTextCharFormat()
+		stderr_format.setForeground(QColor(240, 120, 120))
+		for channel, text in pending:
+			self._append_terminal_text(text, stderr_format if channel == QProcess.StandardError else None)
+
+	def _append_terminal_text(self, text, fmt=None):
+		cursor = QTextCursor(self.terminal_output.document())
+		cursor.movePosition(QTextCursor.End)
+		cursor.insertText(text, fmt or QTextCharFormat())
+		self.terminal_output.ensureCursorVisible()
+
+	def _finish_terminal_line(self):
+		doc = self.terminal_output.document()
+		if doc.characterCount() > 1 and doc.characterAt(doc.characterCount() - 2) != "\u2029":
+			self._append_terminal_text("\n")
+
+	def _on_terminal_finished(self, exit_code, exit_status):
+		process = self.terminal_process
+		if process is None:
+			return
+		for channel in (QProcess.StandardOutput, QProcess.StandardError):
+			self._on_terminal_ready(channel)
+		self._flush_terminal_output()
+		self._finish_terminal_line()
+		if self._terminal_cancelled:
+			self._append_terminal_text("[cancelled]\n")
+		elif exit_status == QProcess.CrashExit:
+			self._append_terminal_text("[terminated]\n")
+		else:
+			self._append_terminal_text(f"[exit {exit_code}]\n")
+		self.terminal_process = None
+		process.deleteLater()
+
+	def _on_terminal_error(self, error):
+		process = self.terminal_process
+		if process is None or error != QProcess.FailedToStart:
+			return
+		self._finish_terminal_line()
+		self._append_terminal_text(f"[error] {process.errorString()}\n")
+		self.terminal_process = None
+		process.deleteLater()
+
+	def cancel_terminal_command(self):
+		if self.terminal_session is not None:
+			return self.terminal_session.interrupt()
+		process = self.terminal_process
+		if process is None:
+			return False
+		self._terminal_cancelled = True
+		process.terminate()
+		QTimer.singleShot(2000, lambda: process.kill() if self.terminal_process is process else None)
+		return True
+
 	def init_menu(self):
 		menu_bar = self.menuBar()
 
@@ -981,6 +4425,12 @@ class MainWindow(QMainWindow):
 		save_raw_action.setShortcut(self.keybinds.get("save_raw_file", "Ctrl+Alt+S"))
 		file_menu.addAction(save_raw_action)
 
+		save_all_action = QAction("Save All", self)
+		save_all_action.setObjectName("save_all_action")
+		save_all_action.setShortcut(self.keybinds.get("save_all", "Ctrl+Alt+Shift+S"))
+		save_all_action.triggered.connect(self.save_all_files)
+		file_menu.addAction(save_all_action)
+
 		reload_all_action = QAction("Reload All Rules", self)
 		reload_all_action.setObjectName("reload_all_action")
 		reload_all_action.triggered.connect(self.reload_all_rules)
@@ -1007,6 +4457,11 @@ class MainWindow(QMainWindow):
 		find_action.triggered.connect(self.toggle_find_replace)
 		edit_menu.addAction(find_action)
 
+		find_in_files_action = QAction("Find in Files", self)
+		find_in_files_action.setObjectName("find_in_files_action")
+		find_in_files_action.triggered.connect(self.toggle_project_search)
+		edit_menu.addAction(find_in_files_action)
+
 		edit_keybinds_action = QAction("Edit Keybindings", self)
 		edit_keybinds_action.setObjectName("edit_keybinds_action")
 		edit_keybinds_action.triggered.connect(self.edit_keybindings)
@@ -1044,38 +4499,38 @@ class MainWindow(QMainWindow):
 		docs_menu.addAction(font_size_action)
 		docs_menu.addAction(line_spacing_action)
 
-		show_terminal_action = QAction("Show Terminal", self)
-		show_terminal_action.triggered.connect(lambda: self.terminal_dock.show())
-		window_menu.addAction(show_terminal_action)
-
-		show_file_browser_action = QAction("Show File Explorer", self)
-		show_file_browser_action.triggered.connect(lambda: self.file_browser.show())
-		window_menu.addAction(show_file_browser_action)
+		latency_overlay_action = QAction("Latency Overlay", self)
+		latency_overlay_action.setObjectName("latency_overlay_action")
+		latency_overlay_action.setCheckable(True)
+		latency_overlay_action.toggled.connect(self.set_latency_overlay)
+		window_menu.addAction(latency_overlay_action)
 
-		self.file_browser = QDockWidget("File Browser", self)
-		self.file_model = QFileSystemModel()
-		self.file_model.setRootPath(os.path.expanduser("~"))
+		dump_latency_action = QAction("Dump Latency Samples", self)
+		dump_latency_action.setObjectName("dump_latency_action")
+		dump_latency_action.triggered.connect(self.dump_latency_samples)
+		window_menu.addAction(dump_latency_action)
 
-		self.tree_view = QTreeView()
-		self.tree_view.setModel(self.file_model)
-		self.tree_view.setRootIndex(self.file_model.index(os.path.expanduser("~")))
-		self.tree_view.doubleClicked.connect(self.open_file_from_browser)
+		show_terminal_action = QAction("Show Terminal", self)
+		show_terminal_action.triggered.connect(lambda: self._ensure_terminal_dock().show())
+		window_menu.addAction(show_terminal_action)
 
-		for col in range(1, 4):
-			try:
-				self.tree_view.setColumnHidden(col, True)
-			except Exception:
-				pass
+		open_folder_action = QAction("Open Folder...", self)
+		open_folder_action.setObjectName("open_folder_action")
+		open_folder_action.triggered.connect(self.open_project_folder)
+		file_menu.addAction(open_folder_action)
 
-		header = self.tree_view.header()
-		header.setSectionResizeMode(0, QHeaderView.Interactive)
-		header.resizeSection(0, 260)
+		quick_open_action = QAction("Quick Open...", self)
+		quick_open_action.setObjectName("quick_open_action")
+		quick_open_action.setShortcut(self.keybinds.get("quick_open", "Ctrl+P"))
+		quick_open_action.triggered.connect(self.quick_open)
+		file_menu.addAction(quick_open_action)
 
-		self.tree_view.setContextMenuPolicy(Qt.CustomContextMenu)
-		self.tree_view.customContextMenuRequested.connect(self.on_tree_context_menu)
+		show_file_browser_action = QAction("Show File Explorer", self)
+		show_file_browser_action.triggered.connect(lambda: self._ensure_file_browser().show())
+		window_menu.addAction(show_file_browser_action)
 
-		self.file_browser.setWidget(self.tree_view)
-		self.addDockWidget(Qt.LeftDockWidgetArea, self.file_browser)
+		self.file_browser = None
+		self.file_model = ProjectFileModel(load_supported_filetypes(), load_ignore_patterns(), self)
 
 		open_action.setShortcut(self.keybinds.get("open_file", "Ctrl+O"))
 		save_action.setShortcut(self.keybinds.get("save_file", "Ctrl+S"))
@@ -1085,6 +4540,7 @@ class MainWindow(QMainWindow):
 		reload_rules_action.setShortcut(self.keybinds.get("reload_rules", "Ctrl+R"))
 		reload_instaplace_action.setShortcut(self.keybinds.get("reload_instaplace", "Ctrl+Shift+I"))
 		find_action.setShortcut(self.keybinds.get("find_replace", "Ctrl+F"))
+		find_in_files_action.setShortcut(self.keybinds.get("find_in_files", "Ctrl+Shift+F"))
 		toggle_instaplace_action.setShortcut(self.keybinds.get("toggle_instaplace", "Ctrl+W"))
 		toggle_suggestions_action.setShortcut(self.keybinds.get("toggle_suggestions", "Ctrl+E"))
 
@@ -1099,6 +4555,8 @@ class MainWindow(QMainWindow):
 		else:
 			path = self.file_model.rootPath()
 			is_dir = True
+		if not path:
+			return
 
 		menu = QMenu()
 		new_file_action = menu.addAction("New File")
@@ -1119,8 +4577,8 @@ class MainWindow(QMainWindow):
 						newpath += ".txt"
 					with open(newpath, "x", encoding="utf-8") as f:
 						f.write("")
-					self.file_model.setRootPath(self.file_model.rootPath())
-					parent_idx = self.file_model.index(dirpath)
+					self.file_model.refresh_directory(dirpath)
+					parent_idx = self.file_model.path_index(dirpath)
 					if parent_idx.isValid():
 						self.tree_view.expand(parent_idx)
 				except FileExistsError:
@@ -1138,8 +4596,8 @@ class MainWindow(QMainWindow):
 				newpath = os.path.join(dirpath, name)
 				try:
 					os.makedirs(newpath, exist_ok=False)
-					self.file_model.setRootPath(self.file_model.rootPath())
-					parent_idx = self.file_model.index(dirpath)
+					self.file_model.refresh_directory(dirpath)
+					parent_idx = self.file_model.path_index(dirpath)
 					if parent_idx.isValid():
 						self.tree_view.expand(parent_idx)
 				except FileExistsError:
@@ -1173,20 +4631,156 @@ class MainWindow(QMainWindow):
 				else:
 					os.remove(filepath)
 				parent_dir = os.path.dirname(filepath)
-				self.file_model.setRootPath(self.file_model.rootPath())
-				parent_idx = self.file_model.index(parent_dir)
+				self.file_model.refresh_directory(parent_dir)
+				parent_idx = self.file_model.path_index(parent_dir)
 				if parent_idx.isValid():
 					self.tree_view.expand(parent_idx)
 			except Exception as e:
 				QMessageBox.information(self, "Error", f"Failed to delete: {e}")
 	
+	def open_project_folder(self):
+		folder = QFileDialog.getExistingDirectory(self, "Open Folder", self.file_model.rootPath() or os.path.expanduser("~"))
+		if folder:
+			self.file_model.set_root(folder)
+			self._ensure_file_browser().show()
+			self.refresh_file_index()
+
+	def refresh_file_index(self):
+		root = self.file_model.rootPath()
+		if not root:
+			return
+		if self.file_indexer is not None:
+			if self.file_indexer.isRunning() and self.file_indexer.root == root:
+				return
+			self.file_indexer.stop()
+		indexer = FileIndexer(root, self.file_model.rules, self.file_model.filetypes, self)
+		indexer.indexed.connect(self._on_file_indexed)
+		self.file_indexer = indexer
+		indexer.start()
+
+	def _on_file_indexed(self, index):
+		if index.root != self.file_model.rootPath():
+			return
+		self.file_index = index
+		if self.quick_open_dialog is not None and self.quick_open_dialog.isVisible():
+			self.quick_open_dialog.set_index(index)
+
+	def quick_open(self):
+		if not self.file_model.rootPath():
+			self.open_project_folder()
+			if not self.file_model.rootPath():
+				return
+		if self.quick_open_dialog is None:
+			self.quick_open_dialog = QuickOpenDialog(self)
+			self.quick_open_dialog.open_callback = self.open_path
+		dialog = self.quick_open_dialog
+		index = self.file_index
+		dialog.set_index(index if index is not None and index.root == self.file_model.rootPath() else None)
+		self.refresh_file_index()
+		dialog.show()
+		dialog.raise_()
+		dialog.activateWindow()
+		dialog.query_input.setFocus()
+		dialog.query_input.selectAll()
+
 	def toggle_find_replace(self):
+		self._ensure_find_dock()
 		if self.find_dock.isVisible():
 			self.find_dock.hide()
 		else:
 			self.find_dock.show()
 			self.find_dock.find_input.setFocus()
 
+	def toggle_project_search(self):
+		self._ensure_search_dock()
+		if self.search_dock.isVisible():
+			self.search_dock.hide()
+		else:
+			self.search_dock.show()
+			self.search_dock.query_input.setFocus()
+			self.search_dock.query_input.selectAll()
+
+	def start_project_search(self):
+		dock = self.search_dock
+		query = dock.query_input.text()
+		root = self.file_model.rootPath()
+		if not root:
+			dock.status_label.setText("Open a folder to search in files.")
+			return
+		if not query:
+			return
+		self.cancel_project_search()
+
+		pattern = query.encode("utf-8")
+		if not dock.regex_checkbox.isChecked():
+			pattern = re.escape(pattern)
+		flags = re.MULTILINE if dock.case_checkbox.isChecked() else re.MULTILINE | re.IGNORECASE
+		try:
+			re.compile(pattern, flags)
+		except re.error as e:
+			QMessageBox.information(self, "Find in Files", f"Invalid regular expression: {e}")
+			return
+
+		dock.results.clear()
+		self._search_hits = 0
+		search = ProjectSearch(root, self.file_model.rules, self.file_model.filetypes, pattern, flags, self)
+		search.file_results.connect(self._on_search_results)
+		search.progress.connect(self._on_search_progress)
+		search.finished.connect(lambda search=search: self._on_search_finished(search))
+		self.project_search = search
+		dock.cancel_button.setEnabled(True)
+		dock.status_label.setText(f"Searching {root}...")
+		search.start()
+
+	def cancel_project_search(self):
+		if self.project_search is not None:
+			self.project_search.cancel()
+			self.project_search.wait()
+
+	def _on_search_results(self, path, hits):
+		if self.sender() is not self.project_search:
+			return
+		root = self.file_model.rootPath() or ""
+		file_item = QTreeWidgetItem([f"{os.path.relpath(path, root)} ({len(hits)})"])
+		file_item.setData(0, Qt.UserRole, (path, hits[0][0]))
+		for line_no, preview in hits:
+			hit_item = QTreeWidgetItem([f"{line_no}: {preview}"])
+			hit_item.setData(0, Qt.UserRole, (path, line_no))
+			file_item.addChild(hit_item)
+		self.search_dock.results.addTopLevelItem(file_item)
+		self._search_hits += len(hits)
+
+	def _on_search_progress(self, done, queued):
+		if self.sender() is not self.project_search:
+			return
+		self.search_dock.status_label.setText(
+			f"{self._search_hits} matching lines in {self.search_dock.results.topLevelItemCount()} files ({done}/{queued} files searched)")
+
+	def _on_search_finished(self, search):
+		if self.project_search is not search:
+			search.deleteLater()
+			return
+		self.project_search = None
+		self.search_dock.cancel_button.setEnabled(False)
+		prefix = "Cancelled: " if search.cancelled else "Done: "
+		self.search_dock.status_label.setText(prefix + self.search_dock.status_label.text())
+		search.deleteLater()
+
+	def open_search_result(self, item):
+		data = item.data(0, Qt.UserRole)
+		if not data:
+			return
+		path, line_no = data
+		tab = self.open_path(path)
+		if isinstance(tab, TextEditorTab):
+			block = tab.editor.document().findBlockByNumber(max(0, line_no - 1))
+			if block.isValid():
+				tab.editor.setTextCursor(QTextCursor(block))
+				tab.editor.centerCursor()
+				tab.editor.setFocus()
+		elif isinstance(tab, LargeFileTab) and line_no - 1 < len(tab.offsets):
+			tab.view.scroll_to_line(line_no - 1)
+
 	def current_tab(self):
 		return self.tabs.currentWidget()
 
@@ -1194,6 +4788,14 @@ class MainWindow(QMainWindow):
 		tab = self.current_tab()
 		return tab.editor if isinstance(tab, TextEditorTab) else None
 
+	def editor_tabs(self):
+		tabs = []
+		for i in range(self.tabs.count()):
+			tab = self.tabs.widget(i)
+			if isinstance(tab, TextEditorTab):
+				tabs.append(tab)
+		return tabs
+
 	def current_linter(self):
 		tab = self.current_tab()
 		return tab.linter if isinstance(tab, TextEditorTab) else None
@@ -1203,6 +4805,12 @@ class MainWindow(QMainWindow):
 			return
 		widget = self.tabs.widget(index)
 		self.tabs.removeTab(index)
+		if isinstance(widget, LargeFileTab):
+			widget.close_file()
+		elif isinstance(widget, TextEditorTab):
+			widget.buffer_words.release()
+			if getattr(widget, "journal", None) is not None:
+				widget.journal.discard()
 
 		if widget:
 			widget.deleteLater()
@@ -1233,8 +4841,7 @@ class MainWindow(QMainWindow):
 				self.current_file_path = raw_path
 
 			content = self.strip_settings_tag(tab.editor.toPlainText())
-			with open(raw_path, "w", encoding="utf-8") as file:
-				file.write(content)
+			self._start_save(tab, raw_path, content)
 
 			self._update_discord_rpc()
 		except Exception as e:
@@ -1247,10 +4854,13 @@ class MainWindow(QMainWindow):
 			"open_file": "Ctrl+O",
 			"save_file": "Ctrl+S",
 			"save_as_file": "Ctrl+Shift+S",
+			"save_all": "Ctrl+Alt+Shift+S",
 			"reload_rules": "Ctrl+L",
 			"reload_all_rules": "Ctrl+R",
 			"reload_instaplace": "Ctrl+I",
 			"find_replace": "Ctrl+F",
+			"find_in_files": "Ctrl+Shift+F",
+			"quick_open": "Ctrl+P",
 			"toggle_instaplace": "Ctrl+W",
 
 			"edit_keybindings": "None",
@@ -1277,11 +4887,14 @@ class MainWindow(QMainWindow):
 			("open_file", self.findChild(QAction, "open_action")),
 			("save_file", self.findChild(QAction, "save_action")),
 			("save_as_file", self.findChild(QAction, "save_as_action")),
+			("save_all", self.findChild(QAction, "save_all_action")),
 			("new_file", self.findChild(QAction, "new_action")),
 			("reload_all_rules", self.findChild(QAction, "reload_all_action")),
 			("reload_rules", self.findChild(QAction, "reload_rules_action")),
 			("reload_instaplace", self.findChild(QAction, "reload_instaplace_action")),
 			("find_replace", self.findChild(QAction, "find_action")),
+			("find_in_files", self.findChild(QAction, "find_in_files_action")),
+			("quick_open", self.findChild(QAction, "quick_open_action")),
 			("toggle_instaplace", self.findChild(QAction, "toggle_instaplace_action")),
 
 			("edit_keybindings", self.findChild(QAction, "edit_keybinds_action")),
@@ -1305,6 +4918,7 @@ class MainWindow(QMainWindow):
 			tab = self.tabs.widget(i)
 			if isinstance(tab, TextEditorTab):
 				tab.instaplace_rules = self.instaplace_rules if self.instaplace_enabled else []
+				tab.instaplace_index = self.instaplace_index
 				editor = self.current_editor()
 				if editor and not self.instaplace_enabled:
 					editor.completer.popup().hide()
@@ -1331,6 +4945,12 @@ class MainWindow(QMainWindow):
 		text = dock.find_input.text()
 		if not text:
 			return
+		tab = self.current_tab()
+		if isinstance(tab, LargeFileTab):
+			if not tab.find_next(text, dock.case_checkbox.isChecked()):
+				self.statusBar().showMessage(f"'{text}' not found")
+			return
+
 		flags = QTextDocument.FindFlags()
 		if dock.case_checkbox.isChecked():
 			flags |= QTextDocument.FindCaseSensitively
@@ -1352,9 +4972,11 @@ class MainWindow(QMainWindow):
 		tab = TextEditorTab(
 			lambda: self.plain_paste_checkbox.isChecked(),
 			suggestions_enabled=self.suggestions_enabled,
-			instaplace_rules=self.instaplace_rules if self.instaplace_enabled else []
+			instaplace_rules=self.instaplace_rules if self.instaplace_enabled else [],
+			instaplace_index=self.instaplace_index
 		)
 		self._wire_up_editor(tab.editor)
+		self._attach_journal(tab)
 
 		index = self.tabs.addTab(tab, "Untitled")
 		self.tabs.setCurrentIndex(index)
@@ -1379,22 +5001,46 @@ class MainWindow(QMainWindow):
 		except Exception as e:
 			print(e)
 			QMessageBox.information(self, "Error:", str(e))
+		self.instaplace_index = build_instaplace_index(self.instaplace_rules)
+		self.instaplace_engine = InstaplaceEngine(self.instaplace_rules)
 
+	@LATENCY.timed("instaplace")
 	def apply_instaplace_live(self):
-		if not self.instaplace_enabled:
+		if not self.instaplace_enabled or self._applying_instaplace or not self.instaplace_engine:
 			return
 
 		editor = self.current_editor()
 		if not editor:
 			return
+		engine = self.instaplace_engine
 		cursor = editor.textCursor()
-		cursor.select(QTextCursor.WordUnderCursor)
-		word = cursor.selectedText()
-
-		for rule in self.instaplace_rules:
-			if word == rule["find"]:
-				cursor.insertText(rule["replace"])
-				break
+		replacement = None
+
+		word_cursor = QTextCursor(cursor)
+		word_cursor.select(QTextCursor.WordUnderCursor)
+		replace = engine.match_word(word_cursor.selectedText())
+		if replace is not None:
+			cursor, replacement = word_cursor, replace
+		elif engine.max_phrase and not cursor.hasSelection():
+			text = cursor.block().text()
+			in_block = cursor.positionInBlock()
+			offsets = _utf16_offsets(text)
+			if offsets is not None:
+				in_block = bisect.bisect_left(offsets, in_block)
+			match = engine.match_phrase_before(text[:in_block])
+			if match:
+				find, replacement = match
+				pos = cursor.position()
+				cursor.setPosition(pos - len(find.encode("utf-16-le")) // 2)
+				cursor.setPosition(pos, QTextCursor.KeepAnchor)
+
+		if replacement is None:
+			return
+		self._applying_instaplace = True
+		try:
+			cursor.insertText(replacement)
+		finally:
+			self._applying_instaplace = False
 
 	def toggle_instaplace(self):
 		self.instaplace_checkbox.setChecked(not self.instaplace_checkbox.isChecked())
@@ -1406,6 +5052,7 @@ class MainWindow(QMainWindow):
 				tab = self.tabs.widget(i)
 				if isinstance(tab, TextEditorTab):
 					tab.instaplace_rules = self.instaplace_rules
+					tab.instaplace_index = self.instaplace_index
 
 	def replace_all_text(self, dock):
 		text = dock.find_input.text()
@@ -1417,12 +5064,52 @@ class MainWindow(QMainWindow):
 		if not editor:
 			return
 
-		flags = Qt.CaseSensitive if dock.case_checkbox.isChecked() else Qt.CaseInsensitive
-		content = editor.toPlainText()
-		new_content = content.replace(text, replacement) if flags == Qt.CaseSensitive else re.sub(re.escape(text),
-																								  replacement, content,
-																								  flags=re.IGNORECASE)
-		editor.setPlainText(new_content)
+		flags = 0 if dock.case_checkbox.isChecked() else re.IGNORECASE
+		pattern = re.compile(re.escape(text), flags)
+		doc = editor.document()
+
+		progress = None
+		if doc.characterCount() > _REPLACE_PROGRESS_CHARS:
+			progress = QProgressDialog("Finding matches...", "Cancel", 0, doc.blockCount(), self)
+			progress.setWindowTitle("Replace All")
+			progress.setWindowModality(Qt.WindowModal)
+			progress.setMinimumDuration(300)
+
+		def on_progress(done):
+			if progress is None:
+				return True
+			progress.setValue(done)
+			return not progress.wasCanceled()
+
+		try:
+			if "\n" in text:
+				# Only a whole-document scan can match across block boundaries.
+				matches = find_text_matches(doc, pattern)
+			else:
+				matches = find_document_matches(doc, pattern, on_progress)
+			if matches is None:
+				self.statusBar().showMessage("Replace All cancelled")
+				return
+			if progress:
+				progress.setLabelText(f"Replacing {len(matches)} matches...")
+				progress.setValue(doc.blockCount())
+
+			if matches:
+				cursor = QTextCursor(doc)
+				editor.setUpdatesEnabled(False)
+				cursor.beginEditBlock()
+				try:
+					for pos, length in reversed(matches):
+						cursor.setPosition(pos)
+						cursor.setPosition(pos + length, QTextCursor.KeepAnchor)
+						cursor.insertText(replacement)
+				finally:
+					cursor.endEditBlock()
+					editor.setUpdatesEnabled(True)
+			self.statusBar().showMessage(f"Replaced {len(matches)} occurrence(s)")
+		finally:
+			if progress:
+				progress.close()
 
 	def eventFilter(self, obj, event):
 		if obj == getattr(self.current_editor(), 'viewport', lambda: None)() and event.type() == QEvent.Paint:
@@ -1431,20 +5118,19 @@ class MainWindow(QMainWindow):
 			return result
 		return super().eventFilter(obj, event)
 
+	@LATENCY.timed("counters.window")
 	def update_counters(self):
 		editor = self.current_editor()
 		tab = self.current_tab()
 
+		if isinstance(tab, LargeFileTab):
+			self.statusBar().showMessage("Large file mode: read-only")
+			return
 		if not editor or not isinstance(tab, TextEditorTab):
 			self.statusBar().showMessage("No document open")
 			return
 
-		text = editor.toPlainText()
-		word_count = len(text.split())
-		char_count = len(text)
-		sentence_count = text.count('.') + text.count('!') + text.count('?')
-		paragraph_count = max(1,
-							  sentence_count // tab.sentence_per_paragraph) if tab.sentence_per_paragraph > 0 else 1
+		word_count, char_count, paragraph_count = tab.update_counters()
 
 		self.statusBar().showMessage(
 			f"Words: {word_count} | Characters: {char_count} | Paragraphs (est.): {paragraph_count}")
@@ -1515,110 +5201,95 @@ class MainWindow(QMainWindow):
 			QMessageBox.information(self, "No document", "No document is open.")
 			return
 		try:
-			cursor = editor.textCursor()
-			block_format = cursor.blockFormat()
-
 			spacing, ok = QInputDialog.getDouble(self, "Line Spacing",
 												 "Enter line spacing multiplier (e.g., 1.0 = normal):",
-												 block_format.lineHeight() / 100.0 if block_format.lineHeight() else 1.0,
+												 editor.line_spacing(),
 												 0.5, 5.0, 1)
 			if ok:
-				block_format.setLineHeight(spacing * 100, QTextBlockFormat.ProportionalHeight)
-				doc = editor.document()
-				cursor.beginEditBlock()
-				block = doc.firstBlock()
-				while block.isValid():
-					cursor.setPosition(block.position())
-					cursor.select(QTextCursor.BlockUnderCursor)
-					cursor.setBlockFormat(block_format)
-					block = block.next()
-				cursor.endEditBlock()
+				editor.set_line_spacing(spacing)
 		except Exception as e:
 			print("Error changing line spacing:", e)
 
 	def open_file_from_browser(self, index):
-		if hasattr(self, 'placeholder_tab') and self.placeholder_tab:
-			self.remove_placeholder_tab()
-		try:
-			path = self.file_model.filePath(index)
-			if os.path.isfile(path):
-				ext = os.path.splitext(path)[1].lower()
-				if ext not in self.supported_filetypes:
-					QMessageBox.warning(self, "Unsupported File", f"File type '{ext}' is not supported.")
-					return
-
-				try:
-					with open(path, 'r', encoding='utf-8') as file:
-						full_text = file.read()
-				except UnicodeDecodeError:
-					QMessageBox.warning(self, "Error", "Cannot open file: Not a valid UTF-8 text file.")
-					return
+		path = self.file_model.filePath(index)
+		if path and os.path.isfile(path):
+			self.open_path(path)
 
-				tab = TextEditorTab(
-					lambda: self.plain_paste_checkbox.isChecked(),
-					suggestions_enabled=self.suggestions_enabled,
-					instaplace_rules=self.instaplace_rules if self.instaplace_enabled else []
-				)
-				self._wire_up_editor(tab.editor)
-
-				tab.path = path
-				tab_name = os.path.basename(path)
-
-				tab.editor.setPlainText(full_text)
-
-				index = self.tabs.addTab(tab, tab_name)
-				self.tabs.setCurrentIndex(index)
+	def open_file(self):
+		path, _ = QFileDialog.getOpenFileName(
+			self, "Open File", "",
+			"Text Files (*.txt *.tlxt *.py *.md *.json *.csv *.java *.class *.rs *.cpp *.css *.js *.html *.c *.cs);;All Files (*)"
+		)
+		if path:
+			self.open_path(path)
 
-				self.update_counters()
-				self._update_discord_rpc()
+	def find_open_tab(self, path):
+		target = os.path.abspath(path)
+		for i in range(self.tabs.count()):
+			tab = self.tabs.widget(i)
+			if getattr(tab, "path", None) and os.path.abspath(tab.path) == target:
+				return tab
+		return None
 
-		except Exception as e:
-			print(e)
-			QMessageBox.information(self, "Error:", str(e))
+	def open_path(self, path):
+		existing = self.find_open_tab(path)
+		if existing is not None:
+			self.tabs.setCurrentWidget(existing)
+			return existing
 
-	def open_file(self):
 		if hasattr(self, 'placeholder_tab') and self.placeholder_tab:
 			self.remove_placeholder_tab()
 		try:
-			path, _ = QFileDialog.getOpenFileName(
-				self, "Open File", "",
-				"Text Files (*.txt *.tlxt *.py *.md *.json *.csv *.java *.class *.rs *.cpp *.css *.js *.html *.c *.cs);;All Files (*)"
-			)
-			if path:
-				ext = os.path.splitext(path)[1].lower()
-				if ext not in self.supported_filetypes:
-					QMessageBox.warning(self, "Unsupported File", f"File type '{ext}' is not supported.")
-					return
+			ext = os.path.splitext(path)[1].lower()
+			if ext not in self.supported_filetypes:
+				QMessageBox.warning(self, "Unsupported File", f"File type '{ext}' is not supported.")
+				return None
 
-				try:
-					with open(path, 'r', encoding='utf-8') as file:
-						full_text = file.read()
-				except UnicodeDecodeError:
-					QMessageBox.warning(self, "Error", "Cannot open file: Not a valid UTF-8 text file.")
-					return
+			if os.path.getsize(path) >= LARGE_FILE_THRESHOLD:
+				return self._open_large_file(path)
 
-				self.current_file_path = path
+			try:
+				with open(path, 'r', encoding='utf-8') as file:
+					full_text = file.read()
+			except UnicodeDecodeError:
+				QMessageBox.warning(self, "Error", "Cannot open file: Not a valid UTF-8 text file.")
+				return None
 
-				tab = TextEditorTab(
-					lambda: self.plain_paste_checkbox.isChecked(),
-					suggestions_enabled=self.suggestions_enabled,
-					instaplace_rules=self.instaplace_rules if self.instaplace_enabled else []
-				)
-				self._wire_up_editor(tab.editor)
+			self.current_file_path = path
 
-				tab.path = path
-				tab_name = os.path.basename(path)
+			tab = TextEditorTab(
+				lambda: self.plain_paste_checkbox.isChecked(),
+				suggestions_enabled=self.suggestions_enabled,
+				instaplace_rules=self.instaplace_rules if self.instaplace_enabled else [],
+				instaplace_index=self.instaplace_index
+			)
+			self._wire_up_editor(tab.editor)
+
+			tab.path = path
+			tab_name = os.path.basename(path)
 
-				tab.editor.setPlainText(full_text)
+			tab.load_text(full_text)
+			self._attach_journal(tab, path)
 
-				index = self.tabs.addTab(tab, tab_name)
-				self.tabs.setCurrentIndex(index)
+			index = self.tabs.addTab(tab, tab_name)
+			self.tabs.setCurrentIndex(index)
 
-				self.update_counters()
-				self._update_discord_rpc()
+			self.update_counters()
+			self._update_discord_rpc()
+			return tab
 		except Exception as e:
 			print(e)
 			QMessageBox.information(self, "Error:", str(e))
+			return None
+
+	def _open_large_file(self, path):
+		tab = LargeFileTab(path)
+		self.current_file_path = path
+		index = self.tabs.addTab(tab, os.path.basename(path))
+		self.tabs.setCurrentIndex(index)
+		self.update_counters()
+		self._update_discord_rpc()
+		return tab
 
 	def save_file(self):
 		try:
@@ -1660,13 +5331,13 @@ class MainWindow(QMainWindow):
 			print(e)
 			QMessageBox.information(self, "Error:", str(e))
 
-	def _save_to_path(self, path):
+	def _save_to_path(self, path, tab=None):
 		try:
-			editor = self.current_editor()
-			tab = self.current_tab()
-			if not editor or not isinstance(tab, TextEditorTab):
+			tab = tab or self.current_tab()
+			if not isinstance(tab, TextEditorTab):
 				QMessageBox.information(self, "No document", "No document is open to save.")
 				return
+			editor = tab.editor
 
 			settings = {
 				"font_family": editor.font().family(),
@@ -1678,13 +5349,96 @@ class MainWindow(QMainWindow):
 			content = editor.toPlainText()
 			data = f"\n{content}"
 
-			with open(path, "w", encoding="utf-8") as file:
-				file.write(data)
+			self._start_save(tab, path, data, skip=1)
 			self._update_discord_rpc()
 		except Exception as e:
 			print(e)
 			QMessageBox.information(self, "Error:", str(e))
 
+	def save_all_files(self):
+		"""
+		Saves every tab that has a path. The writes run concurrently on the save
+		pool; untitled tabs are skipped rather than prompting once per tab.
+		"""
+		started = skipped = 0
+		for tab in self.editor_tabs():
+			if getattr(tab, "path", None):
+				self._save_to_path(tab.path, tab)
+				started += 1
+			else:
+				skipped += 1
+		message = f"Saving {started} file(s)"
+		if skipped:
+			message += f", skipped {skipped} untitled"
+		self.statusBar().showMessage(message, 3000)
+
+	def _start_save(self, tab, path, text, skip=0, changes=None):
+		"""
+		Writes the text snapshot to `path` on the save pool. A tab runs one save
+		at a time: a save requested while another is running replaces any queued
+		one and starts after it, so an older write can never land last. `changes`
+		is the journal's change count when `text` was taken, if not now.
+		"""
+		if changes is None:
+			changes = tab.journal.changes
+		request = (path, text, skip, changes)
+		if tab.save_future is not None:
+			tab.queued_save = request
+			return
+		future = get_save_pool().submit(write_text_atomic, path, text)
+		tab.save_future = future
+		tab.save_request = request
+		self._saves_in_flight.add(future)
+		future.add_done_callback(lambda f: self.save_finished.emit(tab, f))
+		# A queued save can start after its tab was closed and deleted.
+		if tab in self.editor_tabs():
+			self._set_save_status(tab, "saving")
+
+	def _on_save_finished(self, tab, future):
+		self._saves_in_flight.discard(future)
+		tab.save_future = None
+		path, _, skip, changes = tab.save_request
+		tab.save_request = None
+		error = future.exception()
+		if tab not in self.editor_tabs():
+			if error is not None:
+				QMessageBox.information(self, "Error:", f"Could not save {path}: {error}")
+		elif error is not None:
+			print(error)
+			self._set_save_status(tab, "failed")
+			QMessageBox.information(self, "Error:", f"Could not save {path}: {error}")
+		else:
+			try:
+				tab.journal.rebase(path, skip, changes)
+			except OSError as e:
+				print("Autosave failed:", e)
+			self._set_save_status(tab, "saved")
+			self.statusBar().showMessage(f"Saved {path}", 3000)
+		if tab.queued_save is not None:
+			path, text, skip, changes = tab.queued_save
+			tab.queued_save = None
+			self._start_save(tab, path, text, skip, changes)
+
+	def _set_save_status(self, tab, status):
+		tab.save_status = status
+		index = self.tabs.indexOf(tab)
+		if index == -1:
+			return
+		name = os.path.basename(tab.path) if getattr(tab, "path", None) else "Untitled"
+		if status == "saving":
+			name += " (saving...)"
+		elif status == "failed":
+			name += " (save failed)"
+		self.tabs.setTabText(index, name)
+
+	def wait_for_saves(self):
+		"""
+		Blocks until every running and queued save has finished and been reported.
+		"""
+		while self._saves_in_flight:
+			wait_futures(list(self._saves_in_flight))
+			QApplication.processEvents()
+
 	def _apply_settings(self, settings):
 		try:
 			editor = self.current_editor()
@@ -1699,22 +5453,7 @@ class MainWindow(QMainWindow):
 
 			tab.sentence_per_paragraph = settings.get("sentence_per_paragraph", 3)
 
-			spacing = settings.get("line_spacing", 1.0)
-			cursor = editor.textCursor()
-			cursor.beginEditBlock()
-
-			doc = editor.document()
-			block = doc.firstBlock()
-
-			while block.isValid():
-				cursor.setPosition(block.position())
-				cursor.select(QTextCursor.BlockUnderCursor)
-				block_format = cursor.blockFormat()
-				block_format.setLineHeight(spacing * 100, QTextBlockFormat.ProportionalHeight)
-				cursor.setBlockFormat(block_format)
-				block = block.next()
-
-			cursor.endEditBlock()
+			editor.set_line_spacing(settings.get("line_spacing", 1.0))
 
 			self.update_counters()
 		except Exception as e:
@@ -1726,6 +5465,20 @@ class MainWindow(QMainWindow):
 				self.discord_rpc.close()
 		except Exception:
 			pass
+		if self.terminal_process is not None:
+			self.terminal_process.kill()
+			self.terminal_process.waitForFinished(1000)
+		for session in list(self.shell_sessions.values()):
+			session.close()
+		self.file_model.stop()
+		self.cancel_project_search()
+		if self.file_indexer is not None:
+			self.file_indexer.stop()
+		self.wait_for_saves()
+		self.autosave_timer.stop()
+		for tab in self.editor_tabs():
+			tab.journal.discard()
+		get_journal_writer().submit(shutil.rmtree, self.autosave_dir, True)
 		super().closeEvent(event)
 
 	@staticmethod
@@ -1736,22 +5489,16 @@ class MainWindow(QMainWindow):
 		editor = self.current_editor()
 		if not editor:
 			return 1.0
-		cursor = editor.textCursor()
-		block_format = cursor.blockFormat()
-		line_height = block_format.lineHeight()
-		return (line_height / 100.0) if line_height > 0 else 1.0
+		return editor.line_spacing()
 
 	@pyqtSlot()
 	def reload_rules(self):
-		linter = self.current_linter()
-		if linter:
-			try:
-				linter.load_rules()
-			except Exception as e:
-				print("Error reloading linter rules:", e)
-		else:
-			pass
+		try:
+			self.apply_lint_rules(force=True)
+		except Exception as e:
+			print("Error reloading linter rules:", e)
 		self.supported_filetypes = load_supported_filetypes()
+		self.file_model.set_filters(self.supported_filetypes, load_ignore_patterns())
 
 	def navigate_history(self, direction: int):
 		"""
@@ -1768,8 +5515,13 @@ class MainWindow(QMainWindow):
 		self._history_index = new_index
 
 if __name__ == "__main__":
+	multiprocessing.freeze_support()
+	STARTUP_TRACE.mark("module setup")
+	if "--startup-trace" in sys.argv:
+		sys.argv.remove("--startup-trace")
 	setup_user_config()
 	app = QApplication(sys.argv)
+	STARTUP_TRACE.mark("config and QApplication")
 
 	theme_path = get_user_config_path("theme.qss")
 	if os.path.exists(theme_path):
@@ -1786,12 +5538,10 @@ if __name__ == "__main__":
 			print("Could not parse application stylesheet (caught):", e)
 	else:
 		pass
+	STARTUP_TRACE.mark("stylesheet")
 
 	window = MainWindow()
 	window.resize(1540, 900)
 	window.show()
-	try:
-		window._update_discord_rpc()
-	except Exception:
-		pass
+	STARTUP_TRACE.mark("window shown")
 	sys.exit(app.exec_())
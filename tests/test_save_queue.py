@@ -0,0 +1,39 @@
+import os
+import sys
+import tempfile
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ["HOME"] = tempfile.mkdtemp(prefix="tlite-home-")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import QEvent
+from PyQt5.QtWidgets import QApplication, QMessageBox
+
+import main
+
+
+def test_close_tab_with_running_and_queued_save(tmp_path):
+	QMessageBox.question = staticmethod(lambda *args, **kwargs: QMessageBox.No)
+	QMessageBox.information = staticmethod(lambda *args, **kwargs: QMessageBox.Ok)
+	app = QApplication.instance() or QApplication(sys.argv[:1])
+	main.setup_user_config()
+	window = main.MainWindow()
+	window.new_document()
+	tab = window.tabs.currentWidget()
+	path = str(tmp_path / "doc.txt")
+
+	tab.editor.setPlainText("first")
+	window._start_save(tab, path, "first")
+	tab.editor.setPlainText("second")
+	window._start_save(tab, path, "second")
+	assert tab.queued_save is not None
+
+	window.close_tab(window.tabs.indexOf(tab))
+	QApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+	window.wait_for_saves()
+
+	assert not window._saves_in_flight
+	with open(path, encoding="utf-8") as f:
+		assert f.read() == "second"
+	window.close()
+	app.processEvents()